@@ -0,0 +1,456 @@
+"""Benchmark do envio de inscrições e das leituras do painel admin.
+
+Popula um banco de teste com programas e inscrições, repete envios
+multipart realistas (com foto e currículo) para cada programa e leituras
+do painel com filtros, e mostra latência p50/p95/p99 e vazão por endpoint.
+
+Uso:
+    # Dentro do processo (cliente de teste do Flask, banco em cache/benchmark.db)
+    python benchmark.py --inscricoes 20000 --requisicoes 200 --concorrencia 8
+
+    # Contra um servidor rodando com o mesmo banco (sem o limite por IP)
+    DATABASE_URL=sqlite:///$PWD/cache/benchmark.db LIMITES_ATIVOS=0 gunicorn -w 4 app:app
+    python benchmark.py --url http://127.0.0.1:8000 --saida benchmark.json
+
+    # Comparar com um resultado anterior (sai com código 1 se houver regressão)
+    python benchmark.py --comparar benchmark.json --tolerancia 0.2
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+from werkzeug.datastructures import MultiDict
+
+from fiagot import create_app, uploads
+from fiagot.banco import recalcular_contadores
+from fiagot.cache import invalidar_conteudo_publico
+from fiagot.campos import REGISTRO_CAMPOS, esquema_programa, indexar_campos
+from fiagot.modelos import db, STATUS_VALIDOS, Inscricao, Programa
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+BANCO_PADRAO = os.path.join(BASE_DIR, 'cache', 'benchmark.db')
+
+NOMES = ['Ana', 'Beatriz', 'Camila', 'Daniela', 'Fernanda', 'Gabriela', 'Juliana', 'Larissa', 'Mariana', 'Patrícia']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Almeida', 'Ribeiro', 'Gomes']
+ESTADOS = ['SP', 'RJ', 'MG', 'RS', 'PR', 'BA', 'PE', 'SC', 'GO', 'DF']
+CIDADES = ['São Paulo', 'Rio de Janeiro', 'Belo Horizonte', 'Porto Alegre', 'Curitiba', 'Salvador']
+
+# Valores plausíveis para os campos específicos de cada programa
+VALORES_CAMPOS = {
+    'kart': {
+        'cor': ['Branca', 'Preta', 'Parda', 'Amarela', 'Indígena'],
+        'nome_responsavel': ['Maria Silva', 'José Santos'],
+        'telefone_responsavel': ['11999990000'],
+        'tem_condicoes_logistica': ['Sim', 'Não'],
+        'categoria': ['Kids', 'Junior'],
+        'peso': ['45', '52', '60'],
+        'altura': ['1,50', '1,62'],
+        'vestuario': ['Capacete', 'Macacão', 'Luvas', 'Bota'],
+        'categoria_atual': ['Cadete', 'Mirim'],
+        'titulos_resultados': ['Campeã estadual 2024', ''],
+    },
+    'imersao': {
+        'cidade': CIDADES,
+        'escolaridade': ['Ensino Médio Cursando', 'Ensino Médio Completo', 'Superior Cursando'],
+        'participou_antes': ['Sim', 'Não'],
+        'como_ficou_sabendo': ['Instagram', 'Indicação', 'Site da FIA'],
+        'modulo_interesse': ['Engenharia', 'Mecânica', 'Comunicação'],
+    },
+    'estagio-motorsport': {
+        'identidade_genero': ['Mulher cis', 'Mulher trans', 'Não binária'],
+        'cor': ['Branca', 'Preta', 'Parda', 'Amarela', 'Indígena'],
+        'participou_fia_got': ['Sim', 'Não'],
+        'area_atuacao': ['Engenharia', 'Mecânica', 'Marketing'],
+        'ativacoes': ['Stock Car', 'Porsche Cup', 'Formula E', 'Endurance'],
+        'ordem_preferencia': ['Stock Car, Formula E'],
+        'tem_cnh': ['Sim', 'Não'],
+        'linkedin': ['https://linkedin.com/in/exemplo'],
+        'mini_bio': ['Estudante de engenharia apaixonada por corridas. ' * 8],
+        'porque_importante': ['Quero trabalhar no automobilismo. ' * 10],
+        'como_ficou_sabendo': ['Instagram', 'Indicação'],
+    },
+    'e-sports': {
+        'idade': ['16', '18', '21', '25'],
+        'cidade': CIDADES,
+        'nickname': ['speedgirl', 'apexqueen', 'pitlane'],
+        'plataforma': ['PC', 'PlayStation', 'Xbox'],
+        'experiencia': ['Jogo há 3 anos em ligas online.'],
+    },
+}
+
+def carregar_app(banco: str):
+    """Cria o app apontando para o banco de benchmark."""
+    os.makedirs(os.path.dirname(banco), exist_ok=True)
+    # Todas as requisições vêm do mesmo IP: o limite por IP mediria a si mesmo
+    os.environ.setdefault('LIMITES_ATIVOS', '0')
+    return create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + banco})
+
+def nome_aleatorio() -> str:
+    return f'{random.choice(NOMES)} {random.choice(SOBRENOMES)} {random.choice(SOBRENOMES)}'
+
+def data_nascimento_aleatoria() -> str:
+    return (date.today() - timedelta(days=random.randint(10 * 365, 30 * 365))).isoformat()
+
+def campos_formulario(slug: str) -> dict:
+    """Campos do formulário de inscrição, no formato enviado pelo navegador."""
+    nome = nome_aleatorio()
+    campos = {
+        'nome': nome,
+        'email': f'{nome.split()[0].lower()}.{uuid.uuid4().hex[:10]}@exemplo.com.br',
+        'telefone': f'119{random.randint(10000000, 99999999)}',
+        'estado': random.choice(ESTADOS),
+    }
+    # Só os campos que o programa declara (REGISTRO_CAMPOS), como no formulário real
+    valores_programa = VALORES_CAMPOS.get(slug, {})
+    for campo in REGISTRO_CAMPOS.get(slug, []):
+        valores = valores_programa.get(campo.nome)
+        if campo.tipo == 'booleano':
+            campos[campo.nome] = 'on'
+        elif campo.tipo == 'data':
+            campos[campo.nome] = data_nascimento_aleatoria()
+        elif valores and campo.tipo == 'lista':
+            campos[campo.nome] = random.sample(valores, random.randint(1, len(valores)))
+        elif valores:
+            campos[campo.nome] = random.choice(valores)
+    return campos
+
+def campos_extras(slug: str, formulario: dict) -> dict:
+    """campos_extras como gravados pelo app, convertidos pelo esquema do programa."""
+    esquema = esquema_programa(slug)
+    return esquema.ler_campos(esquema.campos, MultiDict(formulario), [])
+
+_foto_base = None
+_curriculo_base = None
+
+def gerar_foto() -> bytes:
+    """JPEG de celular (1600x1200), único a cada chamada como nos envios reais."""
+    global _foto_base
+    from PIL import Image, ImageDraw
+    if _foto_base is None:
+        _foto_base = Image.linear_gradient('L').resize((1600, 1200)).convert('RGB')
+    imagem = _foto_base.copy()
+    desenho = ImageDraw.Draw(imagem)
+    for _ in range(20):
+        x, y = random.randint(0, 1500), random.randint(0, 1100)
+        desenho.rectangle((x, y, x + 100, y + 100), fill=tuple(random.randint(0, 255) for _ in range(3)))
+    saida = BytesIO()
+    imagem.save(saida, 'JPEG', quality=85)
+    return saida.getvalue()
+
+def gerar_curriculo() -> bytes:
+    """PDF de duas páginas; o comentário final muda o hash a cada chamada."""
+    global _curriculo_base
+    if _curriculo_base is None:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+        saida = BytesIO()
+        pdf = canvas.Canvas(saida, pagesize=A4)
+        for pagina in range(2):
+            for linha in range(50):
+                pdf.drawString(50, 800 - linha * 15, f'Experiência profissional {pagina}.{linha} ' * 3)
+            pdf.showPage()
+        pdf.save()
+        _curriculo_base = saida.getvalue()
+    return _curriculo_base + f'%{uuid.uuid4().hex}\n'.encode()
+
+def arquivos_formulario(slug: str) -> dict:
+    arquivos = {}
+    if slug in ('kart', 'estagio-motorsport'):
+        arquivos['foto'] = ('foto.jpg', gerar_foto(), 'image/jpeg')
+    if slug == 'estagio-motorsport':
+        arquivos['curriculo'] = ('curriculo.pdf', gerar_curriculo(), 'application/pdf')
+    return arquivos
+
+# POPULAR O BANCO
+def popular_banco(app, programas: int, inscricoes: int):
+    """Cria os programas e completa o banco até `inscricoes` inscrições."""
+    resultado = app.test_cli_runner().invoke(args=['init-db'])
+    if resultado.exit_code != 0:
+        raise SystemExit(resultado.output)
+
+    with app.app_context():
+        padrao = Programa.query.order_by(Programa.id).all()
+        for numero in range(len(padrao), programas):
+            base = padrao[numero % len(padrao)]
+            slug = f'{base.slug}-{numero // len(padrao) + 1}'
+            if not Programa.query.filter_by(slug=slug).first():
+                db.session.add(Programa(nome=f'{base.nome} ({slug})', slug=slug, ativo=True))
+        # Programas sempre abertos durante o benchmark
+        for programa in Programa.query.all():
+            programa.ativo = True
+            programa.data_abertura = None
+            programa.data_fechamento = None
+        db.session.commit()
+        invalidar_conteudo_publico()
+
+        lista = Programa.query.all()
+        existentes = Inscricao.query.count()
+        faltando = max(inscricoes - existentes, 0)
+        agora = datetime.utcnow()
+        for numero in range(faltando):
+            programa = random.choice(lista)
+            formulario = campos_formulario(programa.slug)
+            inscricao = Inscricao(
+                nome=formulario['nome'],
+                email=formulario['email'],
+                telefone=formulario['telefone'],
+                estado=formulario['estado'],
+                campos_extras=campos_extras(programa.slug, formulario),
+                programa_id=programa.id,
+                status=random.choice(STATUS_VALIDOS),
+                criado_em=agora - timedelta(seconds=random.randint(0, 90 * 24 * 3600)),
+            )
+            db.session.add(inscricao)
+            indexar_campos(inscricao, programa.slug)
+            if numero % 1000 == 999:
+                db.session.commit()
+                print(f'  {numero + 1}/{faltando} inscrições criadas')
+        db.session.commit()
+        recalcular_contadores()
+        print(f'✅ Banco com {len(lista)} programas e {existentes + faltando} inscrições')
+
+# CENÁRIOS
+def montar_cenarios(app) -> list:
+    """(nome, método, caminho, gerador do formulário) para cada endpoint medido."""
+    with app.app_context():
+        programas = Programa.query.order_by(Programa.id).all()
+        ids = [i for (i,) in db.session.query(Inscricao.id).limit(1000)]
+    cenarios = [
+        (f'POST /inscricao/{p.slug}', 'POST', f'/inscricao/{p.slug}', p.slug)
+        for p in programas
+    ]
+    imersao = next((p for p in programas if p.slug == 'imersao'), programas[0])
+    cenarios += [
+        ('GET /admin', 'GET', '/admin', None),
+        ('GET /admin?programa_id', 'GET', f'/admin?programa_id={imersao.id}', None),
+        ('GET /admin?status', 'GET', '/admin?status=pendente', None),
+        ('GET /admin?busca', 'GET', '/admin?busca=silva', None),
+        ('GET /admin?campo', 'GET', f'/admin?programa_id={imersao.id}&campo_cidade=Curitiba', None),
+        ('GET /admin?estado&status', 'GET', '/admin?estado=SP&status=selecionada', None),
+    ]
+    if ids:
+        cenarios.append(('GET /admin/inscricao/<id>', 'GET', lambda: f'/admin/inscricao/{random.choice(ids)}', None))
+    return cenarios
+
+class ClienteLocal:
+    """Cliente de teste do Flask (uma instância por thread), já logado no admin."""
+
+    def __init__(self, app):
+        self.cliente = app.test_client()
+        with self.cliente.session_transaction() as sessao:
+            sessao['admin_logged_in'] = True
+            sessao['admin_email'] = 'benchmark@exemplo.com.br'
+
+    def requisitar(self, metodo, caminho, slug) -> int:
+        if metodo == 'GET':
+            return self.cliente.get(caminho).status_code
+        dados = dict(campos_formulario(slug))
+        for campo, (nome, conteudo, _) in arquivos_formulario(slug).items():
+            dados[campo] = (BytesIO(conteudo), nome)
+        return self.cliente.post(caminho, data=dados, content_type='multipart/form-data').status_code
+
+class SemRedirecionamento(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+def codificar_multipart(campos: dict, arquivos: dict) -> tuple:
+    fronteira = uuid.uuid4().hex
+    partes = []
+    for nome, valor in campos.items():
+        for item in (valor if isinstance(valor, list) else [valor]):
+            partes.append(
+                f'--{fronteira}\r\nContent-Disposition: form-data; name="{nome}"\r\n\r\n{item}\r\n'.encode()
+            )
+    for nome, (arquivo, conteudo, tipo) in arquivos.items():
+        partes.append(
+            f'--{fronteira}\r\nContent-Disposition: form-data; name="{nome}"; filename="{arquivo}"\r\n'
+            f'Content-Type: {tipo}\r\n\r\n'.encode() + conteudo + b'\r\n'
+        )
+    partes.append(f'--{fronteira}--\r\n'.encode())
+    return b''.join(partes), f'multipart/form-data; boundary={fronteira}'
+
+class ClienteHTTP:
+    """Cliente HTTP para um servidor externo, com sessão de admin própria."""
+
+    def __init__(self, url, email, senha):
+        self.url = url.rstrip('/')
+        self.abridor = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), SemRedirecionamento
+        )
+        login = urllib.parse.urlencode({'email': email, 'senha': senha}).encode()
+        if self._abrir(urllib.request.Request(self.url + '/admin/login', data=login)) != 302:
+            raise SystemExit('Login no admin falhou: confira --admin-email e --admin-senha.')
+
+    def _abrir(self, pedido) -> int:
+        try:
+            with self.abridor.open(pedido, timeout=60) as resposta:
+                resposta.read()
+                return resposta.status
+        except urllib.error.HTTPError as erro:
+            return erro.code
+
+    def requisitar(self, metodo, caminho, slug) -> int:
+        if metodo == 'GET':
+            return self._abrir(urllib.request.Request(self.url + caminho))
+        corpo, tipo = codificar_multipart(campos_formulario(slug), arquivos_formulario(slug))
+        return self._abrir(urllib.request.Request(
+            self.url + caminho, data=corpo, headers={'Content-Type': tipo}
+        ))
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil pelo método nearest-rank (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    posicao = max(int(round(p / 100 * len(valores) + 0.5)) - 1, 0)
+    return valores[min(posicao, len(valores) - 1)]
+
+def medir_cenario(novo_cliente, cenario, requisicoes, concorrencia, aquecimento) -> dict:
+    nome, metodo, caminho, slug = cenario
+    local = threading.local()
+
+    def executar(_):
+        if not hasattr(local, 'cliente'):
+            local.cliente = novo_cliente()
+        alvo = caminho() if callable(caminho) else caminho
+        inicio = time.perf_counter()
+        status = local.cliente.requisitar(metodo, alvo, slug)
+        return time.perf_counter() - inicio, status
+
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(executar, range(aquecimento)))
+        inicio = time.perf_counter()
+        resultados = list(executor.map(executar, range(requisicoes)))
+        duracao = time.perf_counter() - inicio
+
+    latencias = sorted(tempo * 1000 for tempo, _ in resultados)
+    erros = sum(1 for _, status in resultados if status >= 400)
+    return {
+        'requisicoes': requisicoes,
+        'erros': erros,
+        'p50_ms': round(percentil(latencias, 50), 2),
+        'p95_ms': round(percentil(latencias, 95), 2),
+        'p99_ms': round(percentil(latencias, 99), 2),
+        'media_ms': round(sum(latencias) / len(latencias), 2),
+        'vazao_rps': round(requisicoes / duracao, 1),
+    }
+
+def imprimir_resultados(resultados: dict):
+    print(f"\n{'endpoint':<36} {'req':>6} {'erros':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8}")
+    for nome, r in resultados.items():
+        print(
+            f"{nome:<36} {r['requisicoes']:>6} {r['erros']:>6} {r['p50_ms']:>7.1f}ms "
+            f"{r['p95_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms {r['vazao_rps']:>8.1f}"
+        )
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> list:
+    """Endpoints cujo p95 subiu ou cuja vazão caiu além da tolerância."""
+    regressoes = []
+    for nome, r in atual['endpoints'].items():
+        anterior = base['endpoints'].get(nome)
+        if not anterior:
+            continue
+        if r['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia):
+            regressoes.append(f"{nome}: p95 {anterior['p95_ms']}ms -> {r['p95_ms']}ms")
+        if r['vazao_rps'] < anterior['vazao_rps'] * (1 - tolerancia):
+            regressoes.append(f"{nome}: vazão {anterior['vazao_rps']} -> {r['vazao_rps']} req/s")
+        if r['erros'] > anterior['erros']:
+            regressoes.append(f"{nome}: erros {anterior['erros']} -> {r['erros']}")
+    return regressoes
+
+def versao_codigo() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecida'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--banco', default=BANCO_PADRAO, help='arquivo SQLite do benchmark')
+    parser.add_argument('--programas', type=int, default=4, help='programas no banco (mínimo: os 4 padrão)')
+    parser.add_argument('--inscricoes', type=int, default=5000, help='inscrições pré-existentes no banco')
+    parser.add_argument('--requisicoes', type=int, default=100, help='requisições medidas por endpoint')
+    parser.add_argument('--concorrencia', type=int, default=4, help='requisições simultâneas')
+    parser.add_argument('--aquecimento', type=int, default=5, help='requisições descartadas por endpoint')
+    parser.add_argument('--url', help='servidor externo (ex.: http://127.0.0.1:8000); padrão: no processo')
+    parser.add_argument('--admin-email', default=os.environ.get('ADMIN_EMAIL', 'admin@example.com'))
+    parser.add_argument('--admin-senha', default=os.environ.get('ADMIN_PASSWORD', 'admin123'))
+    parser.add_argument('--apenas', help='mede só os endpoints que contêm este texto')
+    parser.add_argument('--saida', help='grava o resultado em JSON (baseline)')
+    parser.add_argument('--comparar', help='JSON de um resultado anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='variação aceita na comparação (0.2 = 20%%)')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.semente)
+    app = carregar_app(os.path.abspath(args.banco))
+    popular_banco(app, args.programas, args.inscricoes)
+    cenarios = [c for c in montar_cenarios(app) if not args.apenas or args.apenas in c[0]]
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as pasta:
+        if args.url:
+            novo_cliente = lambda: ClienteHTTP(args.url, args.admin_email, args.admin_senha)
+        else:
+            # Uploads e derivados do benchmark não vão para static/
+            app.config['UPLOAD_FOLDER'] = os.path.join(pasta, 'uploads')
+            app.config['DERIVADOS_FOLDER'] = os.path.join(pasta, 'derivados')
+            novo_cliente = lambda: ClienteLocal(app)
+
+        resultados = {}
+        for cenario in cenarios:
+            print(f'Medindo {cenario[0]}...')
+            resultados[cenario[0]] = medir_cenario(
+                novo_cliente, cenario, args.requisicoes, args.concorrencia, args.aquecimento
+            )
+        if uploads._executor_derivados is not None:
+            uploads._executor_derivados.shutdown(wait=True)
+
+    imprimir_resultados(resultados)
+    atual = {
+        'versao': versao_codigo(),
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {
+            'modo': args.url or 'processo',
+            'programas': args.programas,
+            'inscricoes': args.inscricoes,
+            'requisicoes': args.requisicoes,
+            'concorrencia': args.concorrencia,
+            'python': sys.version.split()[0],
+            'cpus': os.cpu_count(),
+        },
+        'endpoints': resultados,
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+        print(f'\n✅ Resultado gravado em {args.saida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(atual, base, args.tolerancia)
+        print(f"\nComparação com {args.comparar} (versão {base.get('versao')}):")
+        for linha in regressoes:
+            print(f'❌ {linha}')
+        if regressoes:
+            sys.exit(1)
+        print('✅ Nenhuma regressão acima da tolerância')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Inscrições dos programas FIA Girls on Track Brasil.
+
+Importar o pacote não cria o app nem toca em arquivos: tudo acontece em
+`create_app()`. Dependências pesadas (reportlab, Pillow, smtplib,
+multiprocessing) são importadas só por quem as usa.
+"""
+from datetime import datetime
+
+from flask import Flask
+
+from . import admin, cli, publico
+from .banco import configurar_banco
+from .config import BASE_DIR, configuracao_do_ambiente, opcoes_engine
+from .limites import LimitadorRequisicoes
+from .profiling import instalar_profiling
+
+def create_app(config: dict = None) -> Flask:
+    """Cria o app com a configuração do ambiente, sobrescrita por `config`."""
+    app = Flask(__name__, root_path=BASE_DIR)
+    app.config.update(configuracao_do_ambiente())
+    if config:
+        app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', opcoes_engine(app.config))
+
+    configurar_banco(app)
+    app.register_blueprint(publico.bp)
+    app.register_blueprint(admin.bp)
+    app.register_blueprint(cli.bp)
+
+    if app.config['PROFILING_ATIVO']:
+        instalar_profiling(app)
+
+    app.wsgi_app = LimitadorRequisicoes(app)
+
+    # Context processor para ano dinâmico
+    @app.context_processor
+    def inject_current_year():
+        return {'current_year': datetime.now().year}
+
+    return app
@@ -0,0 +1,4 @@
+from flask import session
+
+def is_admin_logged_in() -> bool:
+    return session.get('admin_logged_in') is True
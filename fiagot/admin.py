@@ -0,0 +1,569 @@
+import csv
+import hmac
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from io import StringIO
+from urllib.parse import urlsplit
+
+from flask import (
+    Blueprint, Response, abort, current_app, flash, redirect, render_template, request, send_file,
+    send_from_directory, session, stream_with_context, url_for
+)
+from jinja2 import TemplateError
+from sqlalchemy.orm import joinedload
+from werkzeug.security import check_password_hash
+
+from .acesso import is_admin_logged_in
+from .arquivamento import UPLOADS_FRIOS, consultar_ciclo, listar_ciclos, resumo_ciclo, upload_do_ciclo
+from .cache import invalidar_conteudo_publico
+from .campos import REGISTRO_CAMPOS, agregar_campos
+from .config import LOTES_FOLDER
+from .consultas import (
+    atualizar_status_em_lote, celula_csv, colunas_exportacao, consulta_painel, filtrar_inscricoes,
+    iterar_na_ordem_do_painel, novidades_painel, obter_estatisticas, paginar_busca, paginar_inscricoes, ultimos_eventos
+)
+from .emails import obter_configuracao_email, validar_modelo_email
+from .fichas import (
+    caminho_lote, gerar_lote_fichas, gravar_progresso_lote, ler_progresso_lote, limpar_lotes_antigos, obter_ficha
+)
+from .limites import obter_baldes
+from .modelos import db, STATUS_ROTULOS, STATUS_VALIDOS, AdminUser, Aviso, Inscricao, Programa
+from .profiling import ler_metricas, metricas_prometheus, rotulos_prometheus
+from .uploads import DERIVADOS_MAX_AGE, DERIVADOS_TAMANHOS, caminho_derivado, gerar_derivados
+
+# ROTAS ADMIN
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+ADMIN_POR_PAGINA_MAX = 200
+
+def url_retorno() -> str:
+    """Página do painel de onde veio o formulário, mantendo filtros e cursor."""
+    origem = urlsplit(request.referrer or '')
+    if origem.netloc == request.host and origem.path.startswith('/admin'):
+        return origem.path + (f'?{origem.query}' if origem.query else '')
+    return url_for('admin.dashboard')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email', '').strip()
+        senha = request.form.get('senha', '').strip()
+        admin = AdminUser.query.filter_by(email=email).first()
+        if not admin or not check_password_hash(admin.password_hash, senha):
+            flash('Credenciais inválidas.', 'danger')
+            return render_template('admin_login.html')
+        session['admin_logged_in'] = True
+        session['admin_email'] = admin.email
+        flash('Login realizado com sucesso.', 'success')
+        return redirect(url_for('admin.dashboard'))
+    return render_template('admin_login.html')
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Logout realizado com sucesso.', 'success')
+    return redirect(url_for('admin.login'))
+
+@bp.route('')
+def dashboard():
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    
+    programas = Programa.query.order_by(Programa.nome).all()
+
+    por_pagina = request.args.get('por_pagina', type=int) or current_app.config['ADMIN_POR_PAGINA']
+    por_pagina = max(1, min(por_pagina, ADMIN_POR_PAGINA_MAX))
+
+    # Antes da página: o que chegar durante a consulta vem pelas novidades
+    desde = '%d-%d' % ultimos_eventos()
+
+    busca = request.args.get('busca', '').strip()
+    if busca:
+        filtros_sem_busca = {k: v for k, v in request.args.items() if k != 'busca'}
+        query = consulta_painel(filtros_sem_busca)
+        inscricoes, proximo_cursor = paginar_busca(query, busca, request.args.get('apos'), por_pagina)
+    else:
+        query = consulta_painel(request.args)
+        inscricoes, proximo_cursor = paginar_inscricoes(query, request.args.get('apos'), por_pagina)
+
+    filtros_pagina = request.args.to_dict()
+    filtros_pagina.pop('apos', None)
+    url_proxima = None
+    if proximo_cursor:
+        url_proxima = url_for('admin.dashboard', apos=proximo_cursor, **filtros_pagina)
+    url_primeira = url_for('admin.dashboard', **filtros_pagina) if request.args.get('apos') else None
+
+    # Novidades em tempo real só na primeira página (mesmo vazia), fora da busca textual
+    url_eventos = None
+    if not url_primeira and not busca and current_app.config['ADMIN_EVENTOS_DURACAO'] > 0:
+        url_eventos = url_for('admin.eventos', desde=desde, **filtros_pagina)
+    
+    # Estatísticas
+    programa_id = request.args.get('programa_id')
+    programa_id = int(programa_id) if programa_id and programa_id.isdigit() else None
+    stats, stats_geral = obter_estatisticas(programa_id)
+
+    # Distribuição dos campos indexados do programa filtrado
+    campos_programa = []
+    distribuicao = {}
+    programa_filtrado = next((p for p in programas if p.id == programa_id), None)
+    if programa_filtrado:
+        campos_programa = [c for c in REGISTRO_CAMPOS.get(programa_filtrado.slug, []) if c.indexado]
+        distribuicao = agregar_campos(programa_filtrado.id)
+    
+    return render_template(
+        'admin_dashboard.html',
+        programas=programas,
+        inscricoes=inscricoes,
+        filtros=request.args,
+        stats=stats,
+        stats_geral=stats_geral,
+        url_proxima=url_proxima,
+        url_primeira=url_primeira,
+        url_eventos=url_eventos,
+        filtros_exportacao=filtros_pagina,
+        campos_programa=campos_programa,
+        distribuicao=distribuicao
+    )
+
+@bp.route('/inscricao/<int:inscricao_id>')
+def inscricao_detalhe(inscricao_id):
+    """Corpo do card de uma inscrição, carregado ao expandi-lo no painel."""
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    inscricao = (
+        Inscricao.query
+        .options(joinedload(Inscricao.programa))
+        .filter_by(id=inscricao_id)
+        .first_or_404()
+    )
+    return render_template('admin_inscricao_card.html', inscricao=inscricao)
+
+@bp.route('/foto/<tamanho>/<path:relativo>')
+def foto_derivada(tamanho, relativo):
+    """Miniatura (ou versão média) em webp de uma foto enviada.
+
+    Os uploads são nomeados pelo conteúdo, então a resposta pode ficar em
+    cache no navegador por um ano. Fotos antigas, sem derivado ainda, são
+    convertidas na hora.
+    """
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    if tamanho not in DERIVADOS_TAMANHOS:
+        abort(404)
+    pasta_derivados = current_app.config['DERIVADOS_FOLDER']
+    destino = caminho_derivado(relativo, tamanho)
+    if not os.path.abspath(destino).startswith(pasta_derivados + os.sep):
+        abort(404)
+    if not os.path.exists(destino):
+        try:
+            gerar_derivados(relativo)
+        except OSError:
+            pass
+        if not os.path.exists(destino):
+            return send_from_directory(current_app.config['UPLOAD_FOLDER'], relativo, max_age=3600)
+    resposta = send_from_directory(
+        pasta_derivados,
+        os.path.relpath(destino, pasta_derivados),
+        max_age=DERIVADOS_MAX_AGE
+    )
+    resposta.cache_control.public = False
+    resposta.cache_control.private = True
+    resposta.cache_control.immutable = True
+    return resposta
+
+@bp.route('/exportar.csv')
+def exportar():
+    """Exporta as inscrições filtradas em CSV, transmitido em lotes."""
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+
+    programas = {p.id: p for p in Programa.query.all()}
+    programa_id = request.args.get('programa_id')
+    if programa_id and programa_id.isdigit() and int(programa_id) in programas:
+        slugs = [programas[int(programa_id)].slug]
+    else:
+        slugs = list(REGISTRO_CAMPOS)
+    extras = colunas_exportacao(slugs)
+
+    query = filtrar_inscricoes(Inscricao.query, request.args)
+    cabecalho = [
+        'id', 'programa', 'nome', 'email', 'telefone', 'estado', 'status',
+        'criado_em', 'foto', 'curriculo'
+    ] + extras
+
+    def gerar():
+        buffer = StringIO()
+        writer = csv.writer(buffer, delimiter=';')
+        # BOM para o Excel reconhecer UTF-8
+        buffer.write('\ufeff')
+        writer.writerow(cabecalho)
+        # Mesma ordem do painel; textos do formulário passam por celula_csv
+        for inscricao in iterar_na_ordem_do_painel(query):
+            campos = inscricao.campos_extras or {}
+            writer.writerow([
+                inscricao.id,
+                celula_csv(programas[inscricao.programa_id].nome),
+                celula_csv(inscricao.nome),
+                celula_csv(inscricao.email),
+                celula_csv(inscricao.telefone),
+                celula_csv(inscricao.estado),
+                inscricao.status,
+                inscricao.criado_em.strftime('%d/%m/%Y %H:%M') if inscricao.criado_em else '',
+                inscricao.foto_filename or '',
+                inscricao.curriculo_filename or ''
+            ] + [celula_csv(campos.get(campo)) for campo in extras])
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    nome_arquivo = f"inscricoes_{slugs[0] if len(slugs) == 1 else 'todas'}_{date.today():%Y%m%d}.csv"
+    return Response(
+        stream_with_context(gerar()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={nome_arquivo}'}
+    )
+
+@bp.route('/inscricao/<int:inscricao_id>/ficha.pdf')
+def ficha_pdf(inscricao_id):
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    inscricao = Inscricao.query.get_or_404(inscricao_id)
+    return send_file(
+        obter_ficha(inscricao),
+        mimetype='application/pdf',
+        download_name=f'ficha_{inscricao.id}.pdf'
+    )
+
+@bp.route('/fichas/lote', methods=['POST'])
+def fichas_lote():
+    """Inicia a geração em lote das fichas das inscrições filtradas."""
+    if not is_admin_logged_in():
+        return {'erro': 'Não autorizado.'}, 401
+    os.makedirs(LOTES_FOLDER, exist_ok=True)
+    limpar_lotes_antigos()
+
+    lote_id = uuid.uuid4().hex
+    gravar_progresso_lote(lote_id, {'status': 'na_fila', 'total': 0, 'concluidas': 0, 'erro': None})
+    threading.Thread(
+        target=gerar_lote_fichas,
+        args=(current_app._get_current_object(), lote_id, request.form.to_dict()),
+        daemon=True
+    ).start()
+    return {'lote_id': lote_id, 'progresso': url_for('admin.fichas_lote_progresso', lote_id=lote_id)}, 202
+
+@bp.route('/fichas/lote/<lote_id>')
+def fichas_lote_progresso(lote_id):
+    if not is_admin_logged_in():
+        return {'erro': 'Não autorizado.'}, 401
+    progresso = ler_progresso_lote(lote_id) if re.fullmatch(r'[0-9a-f]{32}', lote_id) else None
+    if progresso is None:
+        return {'erro': 'Lote não encontrado.'}, 404
+    if progresso['status'] == 'concluido':
+        progresso['download'] = url_for('admin.fichas_lote_download', lote_id=lote_id)
+    return progresso
+
+@bp.route('/fichas/lote/<lote_id>/download')
+def fichas_lote_download(lote_id):
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    caminho = caminho_lote(lote_id, 'zip')
+    if not re.fullmatch(r'[0-9a-f]{32}', lote_id) or not os.path.exists(caminho):
+        flash('Arquivo do lote não encontrado ou expirado.', 'danger')
+        return redirect(url_for('admin.dashboard'))
+    return send_file(caminho, mimetype='application/zip', download_name=f'fichas_{date.today():%Y%m%d}.zip')
+
+@bp.route('/inscricao/<int:inscricao_id>/status', methods=['POST'])
+def update_status(inscricao_id):
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    nova = request.form.get('status')
+    if nova not in STATUS_VALIDOS:
+        flash('Status inválido.', 'danger')
+        return redirect(url_for('admin.dashboard'))
+    ins = Inscricao.query.get_or_404(inscricao_id)
+    atualizar_status_em_lote(Inscricao.id == ins.id, nova, session.get('admin_email'))
+    flash('Status atualizado com sucesso.', 'success')
+    return redirect(url_retorno())
+
+@bp.route('/inscricoes/status', methods=['POST'])
+def update_status_lote():
+    """Altera o status de várias inscrições de uma vez.
+
+    Aceita formulário ou JSON com `status`, `notificar` e, para escolher as
+    inscrições, uma lista `ids` ou `aplicar_filtro` junto com os mesmos
+    filtros do painel (programa_id, busca, status_atual, estado, campo_*).
+    """
+    if not is_admin_logged_in():
+        if request.is_json:
+            return {'erro': 'Não autorizado.'}, 401
+        return redirect(url_for('admin.login'))
+
+    if request.is_json:
+        dados = request.get_json(silent=True) or {}
+        ids = dados.get('ids') or []
+    else:
+        dados = request.form.to_dict()
+        ids = request.form.getlist('ids')
+    nova = dados.get('status')
+    notificar = dados.get('notificar') in (True, 'on', '1', 'true')
+
+    erro = None
+    condicao = None
+    if nova not in STATUS_VALIDOS:
+        erro = 'Status inválido.'
+    elif ids:
+        ids = [int(i) for i in ids if str(i).isdigit()]
+        condicao = Inscricao.id.in_(ids)
+    elif dados.get('aplicar_filtro') in (True, 'on', '1', 'true'):
+        filtros = {
+            k: v for k, v in dados.items()
+            if k in ('programa_id', 'busca', 'estado', 'menor_idade') or k.startswith('campo_')
+        }
+        filtros['status'] = dados.get('status_atual')
+        condicao = Inscricao.id.in_(filtrar_inscricoes(db.session.query(Inscricao.id), filtros).statement)
+    else:
+        erro = 'Selecione ao menos uma inscrição.'
+
+    if erro:
+        if request.is_json:
+            return {'erro': erro}, 400
+        flash(erro, 'danger')
+        return redirect(url_retorno())
+
+    total = atualizar_status_em_lote(condicao, nova, session.get('admin_email'), notificar)
+    if request.is_json:
+        return {'atualizadas': total}
+    flash(f'{total} inscrição(ões) atualizada(s).', 'success')
+    return redirect(url_retorno())
+
+def evento_sse(tipo: str, dados, cursor: str) -> str:
+    return f'id: {cursor}\nevent: {tipo}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n'
+
+@bp.route('/eventos')
+def eventos():
+    """Novidades do painel como server-sent events.
+
+    Envia as inscrições novas que casam com os filtros e as mudanças de
+    status feitas por outros admins, consultando só as linhas novas a cada
+    intervalo. A conexão é encerrada depois de ADMIN_EVENTOS_DURACAO segundos
+    e o navegador reconecta sozinho, retomando do último evento recebido.
+    """
+    if not is_admin_logged_in():
+        abort(401)
+    if current_app.config['ADMIN_EVENTOS_DURACAO'] <= 0:
+        abort(404)
+
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('desde', '')
+    try:
+        apos_inscricao, apos_historico = (int(parte) for parte in cursor.split('-'))
+    except ValueError:
+        apos_inscricao, apos_historico = ultimos_eventos()
+    filtros = request.args.to_dict()
+    filtros.pop('desde', None)
+    programa_id = filtros.get('programa_id')
+    programa_id = int(programa_id) if programa_id and programa_id.isdigit() else None
+    admin_email = session.get('admin_email')
+    intervalo = current_app.config['ADMIN_EVENTOS_INTERVALO']
+    limite = current_app.config['ADMIN_EVENTOS_LOTE']
+    encerrar_em = time.monotonic() + current_app.config['ADMIN_EVENTOS_DURACAO']
+
+    def gerar():
+        nonlocal apos_inscricao, apos_historico
+        yield f'retry: {int(intervalo * 1000)}\n\n'
+        while True:
+            novidades = novidades_painel(filtros, apos_inscricao, apos_historico, limite)
+            houve_mudanca = (
+                novidades['apos_inscricao'] != apos_inscricao or novidades['apos_historico'] != apos_historico
+            )
+            apos_inscricao, apos_historico = novidades['apos_inscricao'], novidades['apos_historico']
+            posicao = f'{apos_inscricao}-{apos_historico}'
+
+            for inscricao in novidades['inscricoes']:
+                html = render_template('admin_inscricao_item.html', inscricao=inscricao)
+                yield evento_sse('inscricao', {'id': inscricao.id, 'html': html}, posicao)
+            for mudanca in novidades['mudancas']:
+                if mudanca.admin_email == admin_email:
+                    continue
+                yield evento_sse('status', {
+                    'inscricao_id': mudanca.inscricao_id,
+                    'status': mudanca.status_novo,
+                    'rotulo': STATUS_ROTULOS.get(mudanca.status_novo, mudanca.status_novo),
+                    'admin_email': mudanca.admin_email
+                }, posicao)
+            if novidades['truncado']:
+                yield evento_sse('recarregar', {}, posicao)
+            if houve_mudanca:
+                stats, stats_geral = obter_estatisticas(programa_id)
+                yield evento_sse('estatisticas', {'stats': stats, 'geral': stats_geral}, posicao)
+            else:
+                yield ': ok\n\n'  # mantém a conexão viva em proxies
+
+            # Encerra a transação: libera a conexão e enxerga as gravações seguintes
+            db.session.rollback()
+            if time.monotonic() + intervalo > encerrar_em:
+                break
+            time.sleep(intervalo)
+
+    resposta = Response(stream_with_context(gerar()), mimetype='text/event-stream')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['X-Accel-Buffering'] = 'no'  # nginx: entrega cada evento na hora
+    return resposta
+
+@bp.route('/metrics')
+def metrics():
+    """Métricas de profiling no formato do Prometheus (admin logado ou token)."""
+    if not current_app.config['PROFILING_ATIVO']:
+        abort(404)
+    token = current_app.config['METRICAS_TOKEN']
+    autorizado_por_token = token and hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    )
+    if not autorizado_por_token and not is_admin_logged_in():
+        abort(401)
+    texto = metricas_prometheus(ler_metricas())
+    if current_app.config['LIMITES_ATIVOS']:
+        texto += '# HELP fiagot_limite_rejeicoes_total Requisições recusadas pelo limite por IP.\n'
+        texto += '# TYPE fiagot_limite_rejeicoes_total counter\n'
+        for regra, total in sorted(obter_baldes().rejeicoes().items()):
+            texto += f'fiagot_limite_rejeicoes_total{rotulos_prometheus(regra=regra)} {total}\n'
+    return Response(texto, mimetype='text/plain; version=0.0.4')
+
+@bp.route('/config', methods=['GET', 'POST'])
+def config():
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    
+    programas = Programa.query.order_by(Programa.nome).all()
+    config_email = obter_configuracao_email()
+
+    if request.method == 'POST':
+        template_assunto = request.form.get('template_assunto', '').strip() or config_email.template_assunto
+        template_corpo = request.form.get('template_corpo', '').strip() or config_email.template_corpo
+        template_html = request.form.get('template_html', '').strip() or None
+        try:
+            validar_modelo_email(template_assunto, template_corpo, template_html)
+        except TemplateError as e:
+            flash(f'Modelo de email inválido: {e}', 'danger')
+            return redirect(url_for('admin.config'))
+        config_email.template_assunto = template_assunto
+        config_email.template_corpo = template_corpo
+        config_email.template_html = template_html
+
+        for programa in programas:
+            prefix = f'programa_{programa.id}_'
+            data_abertura_str = request.form.get(prefix + 'data_abertura')
+            data_fechamento_str = request.form.get(prefix + 'data_fechamento')
+            ativo_str = request.form.get(prefix + 'ativo')
+
+            if data_abertura_str:
+                try:
+                    programa.data_abertura = datetime.strptime(data_abertura_str, '%Y-%m-%d').date()
+                except ValueError:
+                    pass
+            else:
+                programa.data_abertura = None
+
+            if data_fechamento_str:
+                try:
+                    programa.data_fechamento = datetime.strptime(data_fechamento_str, '%Y-%m-%d').date()
+                except ValueError:
+                    pass
+            else:
+                programa.data_fechamento = None
+
+            programa.ativo = (ativo_str == 'on')
+
+        db.session.commit()
+        invalidar_conteudo_publico()  # também recarrega o modelo do email de confirmação
+        flash('Configurações atualizadas com sucesso.', 'success')
+        return redirect(url_for('admin.config'))
+
+    avisos = Aviso.query.order_by(Aviso.criado_em.desc()).all()
+    return render_template(
+        'admin_config.html',
+        programas=programas,
+        config_email=config_email,
+        avisos=avisos
+    )
+
+@bp.route('/avisos/novo', methods=['POST'])
+def novo_aviso():
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    programa_id = request.form.get('programa_id')
+    titulo = request.form.get('titulo', '').strip()
+    descricao = request.form.get('descricao', '').strip()
+    if not programa_id or not programa_id.isdigit():
+        flash('Programa inválido.', 'danger')
+        return redirect(url_for('admin.config'))
+    if not titulo or not descricao:
+        flash('Título e descrição do aviso são obrigatórios.', 'danger')
+        return redirect(url_for('admin.config'))
+    aviso = Aviso(
+        programa_id=int(programa_id),
+        titulo=titulo,
+        descricao=descricao,
+        ativo=True
+    )
+    db.session.add(aviso)
+    db.session.commit()
+    invalidar_conteudo_publico()
+    flash('Aviso criado com sucesso.', 'success')
+    return redirect(url_for('admin.config'))
+
+@bp.route('/avisos/<int:aviso_id>/toggle', methods=['POST'])
+def toggle_aviso(aviso_id):
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    aviso = Aviso.query.get_or_404(aviso_id)
+    aviso.ativo = not aviso.ativo
+    db.session.commit()
+    invalidar_conteudo_publico()
+    flash('Aviso atualizado com sucesso.', 'success')
+    return redirect(url_for('admin.config'))
+
+# ARQUIVO DOS CICLOS ENCERRADOS (somente leitura)
+@bp.route('/arquivo')
+@bp.route('/arquivo/<nome>')
+def arquivo(nome=None):
+    """Ciclos arquivados e, se escolhido um, as inscrições dele."""
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    ciclos = listar_ciclos()
+    if nome is not None and nome not in ciclos:
+        abort(404)
+
+    inscricoes, url_proxima, ciclo = [], None, None
+    if nome:
+        ciclo = resumo_ciclo(nome)
+        apos = request.args.get('apos', type=int)
+        inscricoes, proximo = consultar_ciclo(nome, request.args, apos, current_app.config['ADMIN_POR_PAGINA'])
+        if proximo:
+            filtros = {k: v for k, v in request.args.items() if k != 'apos'}
+            url_proxima = url_for('admin.arquivo', nome=nome, apos=proximo, **filtros)
+    return render_template(
+        'admin_arquivo.html',
+        ciclos=[resumo_ciclo(c) for c in ciclos] if nome is None else [],
+        ciclo=ciclo,
+        inscricoes=inscricoes,
+        filtros=request.args,
+        url_proxima=url_proxima,
+        status_rotulos=STATUS_ROTULOS
+    )
+
+@bp.route('/arquivo/<nome>/uploads/<path:relativo>')
+def arquivo_upload(nome, relativo):
+    """Foto ou currículo de uma inscrição arquivada, do armazenamento frio."""
+    if not is_admin_logged_in():
+        return redirect(url_for('admin.login'))
+    if nome not in listar_ciclos() or not upload_do_ciclo(nome, relativo):
+        abort(404)
+    return send_from_directory(os.path.join(current_app.config['ARQUIVO_FOLDER'], UPLOADS_FRIOS), relativo)
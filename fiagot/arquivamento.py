@@ -0,0 +1,330 @@
+import calendar
+import json
+import os
+import shutil
+import sqlite3
+import zlib
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select
+
+from .banco import ajustar_contador, executar_com_retentativa
+from .fichas import remover_fichas
+from .modelos import db, CampoIndexado, EmailFila, HistoricoStatus, Inscricao, Programa
+from .uploads import remover_uploads_sem_uso
+
+# ARQUIVAMENTO DOS CICLOS ENCERRADOS
+# Depois que um programa fecha e a seleção termina, as inscrições finalizadas
+# saem da tabela principal para um arquivo SQLite por ciclo em ARQUIVO_FOLDER
+# (<slug>_<AAAAmmdd do fechamento>.db), com campos_extras e histórico de status
+# comprimidos. Os uploads vão para ARQUIVO_FOLDER/uploads (armazenamento frio),
+# com o mesmo caminho relativo. O painel abre esses arquivos só quando pedido,
+# em modo somente leitura.
+STATUS_FINAIS = ('selecionada', 'nao_selecionada')
+ARQUIVO_LOTE = 500
+UPLOADS_FRIOS = 'uploads'
+
+# Retenção (LGPD): meses após o fechamento do programa até o expurgo dos dados
+# pessoais, por status. Ficam só status, UF e data, para as estatísticas.
+REGRAS_EXPURGO = [
+    ('nao_selecionada', 'LGPD_MESES_NAO_SELECIONADAS'),
+    ('selecionada', 'LGPD_MESES_SELECIONADAS'),
+]
+
+SCHEMA_CICLO = [
+    "CREATE TABLE IF NOT EXISTS ciclo ("
+    "id INTEGER PRIMARY KEY CHECK (id = 1), programa_id INTEGER NOT NULL, slug TEXT NOT NULL, "
+    "nome TEXT NOT NULL, data_abertura TEXT, data_fechamento TEXT NOT NULL, arquivado_em TEXT NOT NULL)",
+
+    "CREATE TABLE IF NOT EXISTS inscricoes ("
+    "id INTEGER PRIMARY KEY, nome TEXT, email TEXT, telefone TEXT, estado TEXT, status TEXT NOT NULL, "
+    "criado_em TEXT, foto_filename TEXT, curriculo_filename TEXT, campos_extras BLOB, historico BLOB, "
+    "arquivado_em TEXT NOT NULL, expurgado_em TEXT)",
+
+    "CREATE INDEX IF NOT EXISTS ix_inscricoes_status ON inscricoes (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_inscricoes_estado ON inscricoes (estado, id)",
+]
+
+def pasta_arquivo() -> str:
+    return current_app.config['ARQUIVO_FOLDER']
+
+def comprimir(valor) -> bytes:
+    if valor is None:
+        return None
+    return zlib.compress(json.dumps(valor, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9)
+
+def descomprimir(dados: bytes):
+    if dados is None:
+        return None
+    return json.loads(zlib.decompress(dados).decode('utf-8'))
+
+def nome_ciclo(programa: Programa) -> str:
+    return f'{programa.slug}_{programa.data_fechamento:%Y%m%d}'
+
+def listar_ciclos() -> list:
+    """Nomes dos ciclos arquivados, em ordem alfabética."""
+    pasta = pasta_arquivo()
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(nome[:-3] for nome in os.listdir(pasta) if nome.endswith('.db'))
+
+def abrir_ciclo(nome: str, escrita: bool = False) -> sqlite3.Connection:
+    """Conexão com o arquivo do ciclo; somente leitura, a não ser que `escrita`."""
+    caminho = os.path.join(pasta_arquivo(), f'{nome}.db')
+    if not escrita:
+        conexao = sqlite3.connect(f'file:{caminho}?mode=ro', uri=True)
+        conexao.row_factory = sqlite3.Row
+        return conexao
+    os.makedirs(pasta_arquivo(), exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.row_factory = sqlite3.Row
+    for sql in SCHEMA_CICLO:
+        conexao.execute(sql)
+    return conexao
+
+def caminho_frio(relativo: str) -> str:
+    return os.path.join(pasta_arquivo(), UPLOADS_FRIOS, relativo)
+
+def somar_meses(data: date, meses: int) -> date:
+    mes = data.month - 1 + meses
+    ano, mes = data.year + mes // 12, mes % 12 + 1
+    return date(ano, mes, min(data.day, calendar.monthrange(ano, mes)[1]))
+
+# ARQUIVAR
+def programas_encerrados(carencia_dias: int, slug: str = None) -> list:
+    """Programas com fechamento há mais de `carencia_dias` dias."""
+    query = Programa.query.filter(
+        Programa.data_fechamento.isnot(None),
+        Programa.data_fechamento < date.today() - timedelta(days=carencia_dias)
+    )
+    if slug:
+        query = query.filter(Programa.slug == slug)
+    return query.order_by(Programa.data_fechamento, Programa.id).all()
+
+def consulta_arquivaveis(programa: Programa):
+    """Inscrições finalizadas do ciclo do programa, sem email ainda na fila.
+
+    Só entram as criadas entre a abertura e o fechamento do ciclo; inscrições
+    de ciclos anteriores vão para o arquivo do ciclo delas.
+    """
+    fim_do_ciclo = datetime.combine(programa.data_fechamento + timedelta(days=1), datetime.min.time())
+    query = Inscricao.query.filter(
+        Inscricao.programa_id == programa.id,
+        Inscricao.status.in_(STATUS_FINAIS),
+        Inscricao.criado_em < fim_do_ciclo,
+        Inscricao.id.notin_(select(EmailFila.inscricao_id).where(
+            EmailFila.status == 'pendente', EmailFila.inscricao_id.isnot(None)
+        ))
+    )
+    if programa.data_abertura:
+        query = query.filter(Inscricao.criado_em >= datetime.combine(programa.data_abertura, datetime.min.time()))
+    return query
+
+def arquivar_programa(programa: Programa) -> int:
+    """Move as inscrições finalizadas do programa para o arquivo do ciclo.
+
+    Cada lote segue a ordem: cópia dos uploads para o armazenamento frio,
+    gravação no arquivo do ciclo, remoção do banco principal e, por fim,
+    remoção dos uploads que nenhuma inscrição ativa usa. Se o processo for
+    interrompido, rodar de novo retoma do ponto em que parou.
+    """
+    nome = nome_ciclo(programa)
+    agora = datetime.utcnow().isoformat(timespec='seconds')
+    conexao = abrir_ciclo(nome, escrita=True)
+    total = 0
+    try:
+        with conexao:
+            conexao.execute(
+                'INSERT OR REPLACE INTO ciclo VALUES (1, ?, ?, ?, ?, ?, ?)',
+                (programa.id, programa.slug, programa.nome,
+                 programa.data_abertura.isoformat() if programa.data_abertura else None,
+                 programa.data_fechamento.isoformat(), agora)
+            )
+
+        while True:
+            lote = consulta_arquivaveis(programa).order_by(Inscricao.id).limit(ARQUIVO_LOTE).all()
+            if not lote:
+                break
+            ids = [inscricao.id for inscricao in lote]
+            historicos = {}
+            for mudanca in HistoricoStatus.query.filter(HistoricoStatus.inscricao_id.in_(ids)).order_by(HistoricoStatus.id):
+                historicos.setdefault(mudanca.inscricao_id, []).append({
+                    'de': mudanca.status_anterior,
+                    'para': mudanca.status_novo,
+                    'admin': mudanca.admin_email,
+                    'em': mudanca.criado_em.isoformat(timespec='seconds') if mudanca.criado_em else None
+                })
+
+            arquivos = {rel for i in lote for rel in (i.foto_filename, i.curriculo_filename) if rel}
+            pasta_uploads = current_app.config['UPLOAD_FOLDER']
+            for relativo in arquivos:
+                origem = os.path.join(pasta_uploads, relativo)
+                destino = caminho_frio(relativo)
+                if os.path.exists(origem) and not os.path.exists(destino):
+                    os.makedirs(os.path.dirname(destino), exist_ok=True)
+                    shutil.copy2(origem, f'{destino}.tmp')
+                    os.replace(f'{destino}.tmp', destino)
+
+            with conexao:
+                conexao.executemany(
+                    'INSERT OR REPLACE INTO inscricoes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)',
+                    [(
+                        i.id, i.nome, i.email, i.telefone, i.estado, i.status,
+                        i.criado_em.isoformat(timespec='seconds') if i.criado_em else None,
+                        i.foto_filename, i.curriculo_filename,
+                        comprimir(i.campos_extras), comprimir(historicos.get(i.id)), agora
+                    ) for i in lote]
+                )
+
+            por_status = {}
+            for inscricao in lote:
+                por_status[inscricao.status] = por_status.get(inscricao.status, 0) + 1
+
+            def remover():
+                for modelo, coluna in ((HistoricoStatus, HistoricoStatus.inscricao_id),
+                                       (EmailFila, EmailFila.inscricao_id),
+                                       (CampoIndexado, CampoIndexado.inscricao_id)):
+                    modelo.query.filter(coluna.in_(ids)).delete(synchronize_session=False)
+                Inscricao.query.filter(Inscricao.id.in_(ids)).delete(synchronize_session=False)
+                for status, quantidade in por_status.items():
+                    ajustar_contador(programa.id, status, -quantidade)
+
+            for inscricao in lote:
+                db.session.expunge(inscricao)
+            executar_com_retentativa(remover)
+            remover_uploads_sem_uso(arquivos)
+            remover_fichas(ids)
+            total += len(lote)
+    finally:
+        conexao.close()
+    return total
+
+# EXPURGO (LGPD)
+def expurgar_ciclo(nome: str, hoje: date = None, simular: bool = False) -> dict:
+    """Apaga os dados pessoais das inscrições do ciclo cujo prazo de retenção venceu.
+
+    Retorna a quantidade por status e os uploads que deixaram de ser usados
+    no ciclo (a remoção do armazenamento frio fica com `expurgar_uploads_frios`).
+    """
+    hoje = hoje or date.today()
+    conexao = abrir_ciclo(nome, escrita=not simular)
+    try:
+        fechamento = date.fromisoformat(conexao.execute('SELECT data_fechamento FROM ciclo').fetchone()[0])
+        vencidos = [
+            status for status, chave in REGRAS_EXPURGO
+            if somar_meses(fechamento, current_app.config[chave]) <= hoje
+        ]
+        resultado = {'por_status': {}, 'arquivos': set()}
+        if not vencidos:
+            return resultado
+
+        marcadores = ', '.join('?' for _ in vencidos)
+        filtro = f'WHERE status IN ({marcadores}) AND expurgado_em IS NULL'
+        for linha in conexao.execute(f'SELECT status, count(*) FROM inscricoes {filtro} GROUP BY status', vencidos):
+            resultado['por_status'][linha[0]] = linha[1]
+        ids = []
+        for linha in conexao.execute(f'SELECT id, foto_filename, curriculo_filename FROM inscricoes {filtro}', vencidos):
+            ids.append(linha[0])
+            resultado['arquivos'].update(rel for rel in linha[1:] if rel)
+        if simular or not resultado['por_status']:
+            return resultado
+
+        # secure_delete + VACUUM: os dados apagados não ficam em páginas livres
+        conexao.execute('PRAGMA secure_delete = ON')
+        with conexao:
+            conexao.execute(
+                'UPDATE inscricoes SET nome = NULL, email = NULL, telefone = NULL, foto_filename = NULL, '
+                f'curriculo_filename = NULL, campos_extras = NULL, expurgado_em = ? {filtro}',
+                [datetime.utcnow().isoformat(timespec='seconds')] + vencidos
+            )
+        conexao.execute('VACUUM')
+        # As fichas em cache também trazem os dados pessoais
+        remover_fichas(ids)
+    finally:
+        conexao.close()
+    return resultado
+
+def expurgar_uploads_frios(arquivos: set) -> int:
+    """Apaga do armazenamento frio os uploads que nenhum ciclo arquivado usa mais."""
+    em_uso = set()
+    for nome in listar_ciclos():
+        conexao = abrir_ciclo(nome)
+        try:
+            for linha in conexao.execute('SELECT foto_filename, curriculo_filename FROM inscricoes'):
+                em_uso.update(rel for rel in linha if rel)
+        finally:
+            conexao.close()
+    apagados = 0
+    for relativo in arquivos - em_uso:
+        caminho = caminho_frio(relativo)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+            apagados += 1
+    return apagados
+
+# CONSULTA (PAINEL)
+def resumo_ciclo(nome: str) -> dict:
+    """Dados do ciclo e contagem das inscrições arquivadas por status."""
+    conexao = abrir_ciclo(nome)
+    try:
+        ciclo = dict(conexao.execute('SELECT * FROM ciclo').fetchone())
+        ciclo['nome_arquivo'] = nome
+        ciclo['por_status'] = dict(conexao.execute(
+            'SELECT status, count(*) FROM inscricoes GROUP BY status'
+        ).fetchall())
+        ciclo['total'] = sum(ciclo['por_status'].values())
+        ciclo['expurgadas'] = conexao.execute(
+            'SELECT count(*) FROM inscricoes WHERE expurgado_em IS NOT NULL'
+        ).fetchone()[0]
+    finally:
+        conexao.close()
+    return ciclo
+
+def consultar_ciclo(nome: str, filtros, apos: int = None, limite: int = 50) -> tuple:
+    """Inscrições arquivadas do ciclo, com os filtros do painel; paginadas por id.
+
+    Retorna (inscrições, id para a próxima página ou None).
+    """
+    condicoes, parametros = [], []
+    if filtros.get('status'):
+        condicoes.append('status = ?')
+        parametros.append(filtros['status'])
+    if filtros.get('estado'):
+        condicoes.append('estado = ?')
+        parametros.append(filtros['estado'].upper())
+    if filtros.get('busca'):
+        condicoes.append('(nome LIKE ? OR email LIKE ?)')
+        parametros += [f"%{filtros['busca']}%"] * 2
+    if apos:
+        condicoes.append('id > ?')
+        parametros.append(apos)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+
+    conexao = abrir_ciclo(nome)
+    try:
+        linhas = conexao.execute(
+            f'SELECT * FROM inscricoes {where} ORDER BY id LIMIT ?', parametros + [limite + 1]
+        ).fetchall()
+    finally:
+        conexao.close()
+
+    inscricoes = []
+    for linha in linhas[:limite]:
+        inscricao = dict(linha)
+        inscricao['campos_extras'] = descomprimir(inscricao['campos_extras']) or {}
+        inscricao['historico'] = descomprimir(inscricao['historico']) or []
+        inscricoes.append(inscricao)
+    proximo = inscricoes[-1]['id'] if len(linhas) > limite else None
+    return inscricoes, proximo
+
+def upload_do_ciclo(nome: str, relativo: str) -> bool:
+    """Indica se o upload pertence a uma inscrição (não expurgada) do ciclo."""
+    conexao = abrir_ciclo(nome)
+    try:
+        return conexao.execute(
+            'SELECT 1 FROM inscricoes WHERE foto_filename = ? OR curriculo_filename = ? LIMIT 1',
+            (relativo, relativo)
+        ).fetchone() is not None
+    finally:
+        conexao.close()
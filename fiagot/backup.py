@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from .modelos import db, VersaoSchema
+
+# BACKUP DO BANCO E DOS UPLOADS
+# Cada backup é uma pasta BACKUP_FOLDER/<AAAAmmdd-HHMMSS>/ com a cópia do banco
+# e um manifesto.json. O banco é copiado pela API de backup do SQLite em passos
+# de poucas páginas, sem bloquear as gravações. Os uploads vão para um
+# depósito comum endereçado pelo conteúdo (BACKUP_FOLDER/objetos/ab/cd/<sha256>.ext):
+# cada backup copia só os arquivos novos e o manifesto lista quais objetos
+# compõem aquele momento. Os derivados e as fichas em cache não entram, pois
+# são gerados de novo a partir do banco e dos uploads.
+MANIFESTO = 'manifesto.json'
+BANCO_BACKUP = 'database.db'
+OBJETOS = 'objetos'
+BLOCO_HASH = 1024 * 1024
+
+# Uploads gravados por `salvar_upload` já têm o SHA-256 no nome
+NOME_POR_CONTEUDO = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.(\w+)$')
+
+# Se o banco for alterado durante a cópia, o SQLite recomeça do início; depois
+# de tantas tentativas a cópia é feita de uma vez só.
+REINICIOS_MAX = 5
+
+class BackupReiniciado(Exception):
+    pass
+
+def pasta_backups() -> str:
+    return current_app.config['BACKUP_FOLDER']
+
+def sha256_arquivo(caminho: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(BLOCO_HASH), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+def listar_backups() -> list:
+    """Nomes dos backups completos, do mais antigo para o mais recente."""
+    pasta = pasta_backups()
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(
+        nome for nome in os.listdir(pasta)
+        if nome != OBJETOS and os.path.exists(os.path.join(pasta, nome, MANIFESTO))
+    )
+
+def ler_manifesto(nome: str) -> dict:
+    with open(os.path.join(pasta_backups(), nome, MANIFESTO), encoding='utf-8') as f:
+        return json.load(f)
+
+# CÓPIA DO BANCO
+def copiar_banco(destino: str, paginas: int, pausa: float) -> dict:
+    """Copia o banco em uso para `destino` em passos de `paginas` páginas.
+
+    Entre os passos a leitura é liberada (e há uma pausa opcional), então os
+    workers continuam gravando normalmente durante a cópia.
+    """
+    passos = {'quantidade': 0, 'reinicios': 0, 'restantes': None}
+
+    def progresso(status, restantes, total):
+        if passos['restantes'] is not None and restantes > passos['restantes']:
+            passos['reinicios'] += 1
+            if passos['reinicios'] > REINICIOS_MAX:
+                raise BackupReiniciado()
+        passos['quantidade'] += 1
+        passos['restantes'] = restantes
+        if pausa and restantes:
+            time.sleep(pausa)
+
+    origem = db.engine.raw_connection()
+    try:
+        copia = sqlite3.connect(destino)
+        try:
+            try:
+                origem.driver_connection.backup(copia, pages=paginas, progress=progresso)
+            except BackupReiniciado:
+                origem.driver_connection.backup(copia, pages=-1)
+            # A cópia fica num arquivo único, sem WAL
+            copia.execute('PRAGMA journal_mode=DELETE')
+            total_paginas = copia.execute('PRAGMA page_count').fetchone()[0]
+        finally:
+            copia.close()
+    finally:
+        origem.close()
+    return {'paginas': total_paginas, 'passos': passos['quantidade'], 'reinicios': passos['reinicios']}
+
+def consultar_copia(caminho: str, sql: str) -> list:
+    conexao = sqlite3.connect(f'file:{caminho}?mode=ro', uri=True)
+    try:
+        return conexao.execute(sql).fetchall()
+    finally:
+        conexao.close()
+
+def integridade_banco(caminho: str) -> str:
+    """Resultado do PRAGMA integrity_check ('ok' se íntegro)."""
+    return '; '.join(linha[0] for linha in consultar_copia(caminho, 'PRAGMA integrity_check'))
+
+# UPLOADS ENDEREÇADOS POR CONTEÚDO
+def objeto_upload(relativo: str, caminho: str, anterior: dict) -> str:
+    """Nome do objeto de um upload: pelo nome do arquivo, pelo backup anterior ou pelo hash."""
+    if NOME_POR_CONTEUDO.match(relativo):
+        return relativo
+    info = os.stat(caminho)
+    if anterior and anterior['tamanho'] == info.st_size and anterior['mtime_ns'] == info.st_mtime_ns:
+        return anterior['objeto']
+    digest = sha256_arquivo(caminho)
+    extensao = relativo.rsplit('.', 1)[1].lower() if '.' in os.path.basename(relativo) else 'bin'
+    return f'{digest[:2]}/{digest[2:4]}/{digest}.{extensao}'
+
+def copiar_arquivo(origem: str, destino: str):
+    """Copia via arquivo temporário, para nunca deixar um destino pela metade."""
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = f'{destino}.{os.getpid()}.tmp'
+    shutil.copy2(origem, temporario)
+    os.replace(temporario, destino)
+
+def copiar_uploads(anteriores: dict) -> tuple:
+    """Copia para o depósito os uploads novos; retorna (entradas do manifesto, novos)."""
+    pasta = current_app.config['UPLOAD_FOLDER']
+    objetos = os.path.join(pasta_backups(), OBJETOS)
+    entradas = {}
+    novos = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for arquivo in arquivos:
+            if arquivo.endswith('.part'):
+                continue  # upload ainda em gravação
+            caminho = os.path.join(raiz, arquivo)
+            relativo = os.path.relpath(caminho, pasta).replace(os.sep, '/')
+            objeto = objeto_upload(relativo, caminho, anteriores.get(relativo))
+            destino = os.path.join(objetos, objeto)
+            info = os.stat(caminho)
+            # Um objeto com tamanho errado (cópia danificada) é gravado de novo
+            if not os.path.exists(destino) or os.path.getsize(destino) != info.st_size:
+                copiar_arquivo(caminho, destino)
+                novos += 1
+            entradas[relativo] = {'objeto': objeto, 'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    return entradas, novos
+
+# CRIAR, VERIFICAR, RESTAURAR
+def criar_backup(paginas: int = 1024, pausa: float = 0) -> tuple:
+    """Faz um backup completo do momento atual; retorna (nome, manifesto).
+
+    O backup é montado numa pasta temporária e só aparece na lista quando
+    termina, então um backup interrompido nunca é usado para restaurar.
+    """
+    inicio = time.monotonic()
+    existentes = listar_backups()
+    anteriores = ler_manifesto(existentes[-1])['uploads'] if existentes else {}
+
+    nome = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+    if nome in existentes:
+        nome += f'-{sum(existente.startswith(nome) for existente in existentes)}'
+    pasta = os.path.join(pasta_backups(), nome)
+    parcial = pasta + '.parcial'
+    shutil.rmtree(parcial, ignore_errors=True)
+    os.makedirs(parcial)
+
+    try:
+        banco = os.path.join(parcial, BANCO_BACKUP)
+        copia = copiar_banco(banco, paginas, pausa)
+        integridade = integridade_banco(banco)
+        if integridade != 'ok':
+            raise RuntimeError(f'Cópia do banco corrompida: {integridade}')
+        uploads, novos = copiar_uploads(anteriores)
+
+        versao_schema = consultar_copia(banco, f'SELECT max(versao) FROM {VersaoSchema.__tablename__}')[0][0]
+        manifesto = {
+            'criado_em': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'versao_schema': versao_schema,
+            'banco': dict(copia, arquivo=BANCO_BACKUP, tamanho=os.path.getsize(banco), sha256=sha256_arquivo(banco)),
+            'uploads': uploads,
+            'objetos_novos': novos,
+            'duracao_segundos': round(time.monotonic() - inicio, 3),
+        }
+        with open(os.path.join(parcial, MANIFESTO), 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=1)
+        os.replace(parcial, pasta)
+    except BaseException:
+        shutil.rmtree(parcial, ignore_errors=True)
+        raise
+    return nome, manifesto
+
+def verificar_backup(nome: str, completo: bool = False) -> list:
+    """Lista os problemas encontrados no backup (vazia se estiver íntegro).
+
+    Confere o hash e a integridade da cópia do banco e a presença (e o
+    tamanho) de cada upload no depósito; com `completo`, recalcula também o
+    hash de cada upload.
+    """
+    manifesto = ler_manifesto(nome)
+    pasta = os.path.join(pasta_backups(), nome)
+    problemas = []
+
+    banco = os.path.join(pasta, manifesto['banco']['arquivo'])
+    if not os.path.exists(banco):
+        return [f'Cópia do banco ausente: {banco}']
+    if sha256_arquivo(banco) != manifesto['banco']['sha256']:
+        problemas.append('Hash da cópia do banco não confere.')
+    integridade = integridade_banco(banco)
+    if integridade != 'ok':
+        problemas.append(f'integrity_check: {integridade}')
+
+    objetos = os.path.join(pasta_backups(), OBJETOS)
+    for relativo, entrada in manifesto['uploads'].items():
+        caminho = os.path.join(objetos, entrada['objeto'])
+        if not os.path.exists(caminho):
+            problemas.append(f'Upload ausente: {relativo}')
+        elif os.path.getsize(caminho) != entrada['tamanho']:
+            problemas.append(f'Tamanho diferente: {relativo}')
+        elif completo and sha256_arquivo(caminho) != os.path.basename(entrada['objeto']).split('.')[0]:
+            problemas.append(f'Hash não confere: {relativo}')
+    return problemas
+
+def restaurar_backup(nome: str) -> dict:
+    """Restaura o banco e os uploads do backup `nome` sobre os atuais.
+
+    O banco é sobrescrito pela API de backup (com o lock do SQLite, sem
+    trocar o arquivo por baixo dos workers). Uploads ausentes ou diferentes
+    voltam do depósito; arquivos enviados depois do backup são mantidos.
+    """
+    manifesto = ler_manifesto(nome)
+    pasta = os.path.join(pasta_backups(), nome)
+
+    db.session.remove()
+    fonte = sqlite3.connect(f"file:{os.path.join(pasta, manifesto['banco']['arquivo'])}?mode=ro", uri=True)
+    destino = db.engine.raw_connection()
+    try:
+        fonte.backup(destino.driver_connection)
+    finally:
+        destino.close()
+        fonte.close()
+    db.engine.dispose()
+
+    uploads = current_app.config['UPLOAD_FOLDER']
+    objetos = os.path.join(pasta_backups(), OBJETOS)
+    restaurados = 0
+    for relativo, entrada in manifesto['uploads'].items():
+        caminho = os.path.join(uploads, relativo)
+        if os.path.exists(caminho) and os.path.getsize(caminho) == entrada['tamanho']:
+            continue
+        copiar_arquivo(os.path.join(objetos, entrada['objeto']), caminho)
+        restaurados += 1
+    return {'uploads_restaurados': restaurados, 'versao_schema': manifesto.get('versao_schema')}
+
+def podar_backups(manter: int) -> tuple:
+    """Apaga os backups mais antigos e os objetos que nenhum backup usa mais."""
+    nomes = listar_backups()
+    removidos = nomes[:-manter] if manter > 0 else []
+    for nome in removidos:
+        shutil.rmtree(os.path.join(pasta_backups(), nome))
+
+    usados = set()
+    for nome in listar_backups():
+        usados.update(entrada['objeto'] for entrada in ler_manifesto(nome)['uploads'].values())
+    objetos = os.path.join(pasta_backups(), OBJETOS)
+    apagados = 0
+    for raiz, _, arquivos in os.walk(objetos):
+        for arquivo in arquivos:
+            caminho = os.path.join(raiz, arquivo)
+            if os.path.relpath(caminho, objetos).replace(os.sep, '/') not in usados:
+                os.remove(caminho)
+                apagados += 1
+    return removidos, apagados
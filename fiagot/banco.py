@@ -0,0 +1,147 @@
+import random
+import sqlite3
+import time
+
+from flask import current_app
+from sqlalchemy import DDL, column, event, func, table, text
+from sqlalchemy.exc import OperationalError
+
+from .modelos import db, ContadorStatus, Inscricao
+
+def configurar_banco(app):
+    """Liga o SQLAlchemy ao app e ajusta cada conexão SQLite aberta pelo pool."""
+    db.init_app(app)
+    espera_ms = app.config['SQLITE_BUSY_TIMEOUT_MS']
+
+    def configurar_conexao_sqlite(conexao, registro):
+        """WAL permite leituras durante uma escrita; busy_timeout espera o lock."""
+        if not isinstance(conexao, sqlite3.Connection):
+            return
+        cursor = conexao.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={espera_ms}')
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', configurar_conexao_sqlite)
+
+def banco_sqlite() -> bool:
+    return db.engine.dialect.name == 'sqlite'
+
+def banco_travado(erro: OperationalError) -> bool:
+    """Erro transitório de concorrência, que vale a pena repetir."""
+    if getattr(erro.orig, 'pgcode', None) in ('40001', '40P01'):  # serialização / deadlock
+        return True
+    mensagem = str(erro.orig).lower()
+    return 'database is locked' in mensagem or 'database table is locked' in mensagem
+
+def executar_com_retentativa(operacao, tentativas: int = None):
+    """Executa `operacao` e faz o commit, repetindo tudo se o banco estiver travado.
+
+    A operação deve montar a transação inteira a cada chamada, pois o
+    rollback descarta o que foi adicionado à sessão na tentativa anterior.
+    """
+    tentativas = tentativas or current_app.config['DB_TENTATIVAS_COMMIT']
+    for tentativa in range(1, tentativas + 1):
+        try:
+            resultado = operacao()
+            db.session.commit()
+            return resultado
+        except OperationalError as e:
+            db.session.rollback()
+            if tentativa == tentativas or not banco_travado(e):
+                raise
+            time.sleep(min(0.05 * 2 ** tentativa, 1.0) * random.uniform(0.5, 1.5))
+
+def iterar_em_lotes(query, tamanho=500):
+    """Percorre a consulta de inscrições em lotes por id.
+
+    Cada lote é uma consulta curta, então nenhum cursor fica aberto (nem
+    bloqueia escritas no SQLite) enquanto a resposta é transmitida.
+    """
+    ultimo_id = 0
+    while True:
+        lote = query.filter(Inscricao.id > ultimo_id).order_by(Inscricao.id).limit(tamanho).all()
+        if not lote:
+            return
+        yield from lote
+        ultimo_id = lote[-1].id
+
+# BUSCA TEXTUAL (SQLite FTS5)
+# Índice sobre nome, email e algumas chaves de campos_extras, mantido por
+# triggers. O tokenizer remove acentos, então "conceicao" encontra "Conceição".
+CAMPOS_BUSCA = ['cidade', 'nickname', 'categoria', 'plataforma', 'area_atuacao', 'modulo_interesse']
+
+def _extras_busca(linha: str) -> str:
+    return " || ' ' || ".join(
+        f"coalesce(json_extract({linha}.campos_extras, '$.{campo}'), '')" for campo in CAMPOS_BUSCA
+    )
+
+DDL_BUSCA_TEXTUAL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inscricoes_busca USING fts5("
+    "nome, email, extras, tokenize='unicode61 remove_diacritics 2')",
+
+    "CREATE TRIGGER IF NOT EXISTS inscricoes_busca_ai AFTER INSERT ON inscricoes BEGIN "
+    "INSERT INTO inscricoes_busca (rowid, nome, email, extras) "
+    f"VALUES (new.id, new.nome, new.email, {_extras_busca('new')}); END",
+
+    "CREATE TRIGGER IF NOT EXISTS inscricoes_busca_ad AFTER DELETE ON inscricoes BEGIN "
+    "DELETE FROM inscricoes_busca WHERE rowid = old.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS inscricoes_busca_au AFTER UPDATE OF nome, email, campos_extras ON inscricoes BEGIN "
+    "DELETE FROM inscricoes_busca WHERE rowid = old.id; "
+    "INSERT INTO inscricoes_busca (rowid, nome, email, extras) "
+    f"VALUES (new.id, new.nome, new.email, {_extras_busca('new')}); END",
+]
+
+for _sql in DDL_BUSCA_TEXTUAL:
+    event.listen(Inscricao.__table__, 'after_create', DDL(_sql).execute_if(dialect='sqlite'))
+
+inscricoes_busca = table('inscricoes_busca', column('rowid'), column('nome'), column('email'), column('extras'))
+
+def criar_busca_textual():
+    """Cria o índice FTS5 e suas triggers em um banco existente (só SQLite)."""
+    if not banco_sqlite():
+        return
+    for sql in DDL_BUSCA_TEXTUAL:
+        db.session.execute(text(sql))
+    popular_busca_textual()
+
+def popular_busca_textual():
+    """Reconstrói o índice de busca a partir das inscrições existentes."""
+    db.session.execute(text('DELETE FROM inscricoes_busca'))
+    db.session.execute(text(
+        'INSERT INTO inscricoes_busca (rowid, nome, email, extras) '
+        f"SELECT id, nome, email, {_extras_busca('inscricoes')} FROM inscricoes"
+    ))
+
+# CONTADORES DE STATUS
+def ajustar_contador(programa_id: int, status: str, delta: int):
+    """Soma `delta` ao contador (programa, status) na transação corrente."""
+    if banco_sqlite():
+        from sqlalchemy.dialects.sqlite import insert as insert_upsert
+    else:
+        from sqlalchemy.dialects.postgresql import insert as insert_upsert
+    stmt = insert_upsert(ContadorStatus).values(
+        programa_id=programa_id,
+        status=status,
+        total=delta
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['programa_id', 'status'],
+        set_={'total': ContadorStatus.total + delta}
+    )
+    db.session.execute(stmt)
+
+def recalcular_contadores():
+    """Reconstrói os contadores a partir das inscrições com um único GROUP BY."""
+    linhas = (
+        db.session.query(Inscricao.programa_id, Inscricao.status, func.count(Inscricao.id))
+        .group_by(Inscricao.programa_id, Inscricao.status)
+        .all()
+    )
+    ContadorStatus.query.delete()
+    for programa_id, status, total in linhas:
+        db.session.add(ContadorStatus(programa_id=programa_id, status=status, total=total))
+    db.session.commit()
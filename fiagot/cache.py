@@ -0,0 +1,80 @@
+import hashlib
+import os
+import time
+from datetime import date, datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+from .acesso import is_admin_logged_in
+from .config import VERSAO_CONTEUDO_ARQUIVO
+
+# CACHE DAS PÁGINAS PÚBLICAS
+# As páginas públicas só mudam quando um admin edita programas ou avisos (ou
+# quando vira o dia, por causa da janela de inscrição). O HTML renderizado fica
+# em memória por endpoint, parâmetros e data, e é descartado quando a versão
+# do conteúdo muda. A versão vem de um arquivo marcador, para que a
+# invalidação feita por um worker do gunicorn valha para todos os outros.
+_cache_paginas = {}
+
+def versao_conteudo() -> tuple:
+    """Retorna (versão, momento da última alteração) do conteúdo público."""
+    try:
+        info = os.stat(VERSAO_CONTEUDO_ARQUIVO)
+    except FileNotFoundError:
+        return '0', datetime(2000, 1, 1, tzinfo=timezone.utc)
+    return f'{info.st_mtime_ns}-{info.st_ino}', datetime.fromtimestamp(info.st_mtime, timezone.utc)
+
+def invalidar_conteudo_publico():
+    """Invalida o cache das páginas públicas em todos os workers."""
+    os.makedirs(os.path.dirname(VERSAO_CONTEUDO_ARQUIVO), exist_ok=True)
+    temporario = f'{VERSAO_CONTEUDO_ARQUIVO}.{os.getpid()}.tmp'
+    with open(temporario, 'w') as f:
+        f.write(str(time.time_ns()))
+    os.replace(temporario, VERSAO_CONTEUDO_ARQUIVO)
+    _cache_paginas.clear()
+
+def cache_pagina(view):
+    """Serve a página do cache e responde 304 quando o navegador já a tem.
+
+    Visitantes com mensagens flash pendentes ou admins logados recebem a
+    página renderizada na hora, já que ela depende da sessão. Sem cookie de
+    sessão a sessão nem é consultada: ler a sessão faz o Flask mandar
+    `Vary: Cookie`, o que impede proxies de compartilhar a página.
+    """
+    @wraps(view)
+    def wrapper(**kwargs):
+        nome_cookie = current_app.session_interface.get_cookie_name(current_app)
+        tem_sessao = nome_cookie in request.cookies
+        if tem_sessao and (session.get('_flashes') or is_admin_logged_in()):
+            return view(**kwargs)
+
+        hoje = date.today()
+        versao, alterado_em = versao_conteudo()
+        chave = (request.endpoint, tuple(sorted(kwargs.items())))
+        entrada = _cache_paginas.get(chave)
+        if entrada is None or entrada['versao'] != versao or entrada['dia'] != hoje:
+            html = view(**kwargs)
+            if not isinstance(html, str):
+                return html
+            if not tem_sessao:
+                # O template leu uma sessão vazia; a página não depende dela
+                session.accessed = False
+            inicio_do_dia = datetime.combine(hoje, datetime.min.time()).astimezone(timezone.utc)
+            entrada = {
+                'versao': versao,
+                'dia': hoje,
+                'html': html,
+                'etag': hashlib.sha1(html.encode('utf-8')).hexdigest(),
+                'modificado_em': max(alterado_em, inicio_do_dia)
+            }
+            _cache_paginas[chave] = entrada
+
+        resposta = make_response(entrada['html'])
+        resposta.set_etag(entrada['etag'])
+        resposta.last_modified = entrada['modificado_em']
+        # Pode ser guardada por proxies, mas sempre revalidada (ETag)
+        resposta.cache_control.public = True
+        resposta.cache_control.no_cache = True
+        return resposta.make_conditional(request)
+    return wrapper
@@ -0,0 +1,444 @@
+import hashlib
+import re
+from datetime import date
+from functools import partial
+
+from flask import current_app
+from sqlalchemy import func, update
+from sqlalchemy.orm import load_only
+
+from .banco import iterar_em_lotes
+from .modelos import db, CampoIndexado, Inscricao, Programa
+from .uploads import FORMATOS_ARQUIVO, extensao_pelo_conteudo
+
+# REGISTRO DE CAMPOS POR PROGRAMA
+UFS = {
+    'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+    'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO'
+}
+EMAIL_VALIDO = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')
+# Número com unidade opcional: "45", "45kg", "1,62", "1.62 m"
+NUMERO = re.compile(r'([-+]?\d+(?:[.,]\d+)?)\s*[a-zA-Zç]*')
+
+class Campo:
+    """Campo específico de um programa, guardado em `Inscricao.campos_extras`.
+
+    O valor lido do formulário é convertido conforme o tipo (ver
+    CONVERSORES); `minimo` e `maximo` limitam números ou o tamanho do texto.
+    Campos `indexado=True` também são gravados na tabela campos_indexados,
+    onde o painel pode filtrar e agregar por eles em SQL.
+    """
+
+    def __init__(self, nome, tipo='texto', obrigatorio=False, mensagem=None, indexado=False, rotulo=None,
+                 minimo=None, maximo=None):
+        self.nome = nome
+        self.tipo = tipo  # texto, data, lista, booleano, inteiro, decimal, email ou uf
+        self.obrigatorio = obrigatorio
+        self.mensagem = mensagem
+        self.indexado = indexado
+        self.rotulo = rotulo or nome.replace('_', ' ').title()
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def ler(self, form):
+        if self.tipo == 'lista':
+            return form.getlist(self.nome)
+        if self.tipo == 'booleano':
+            return form.get(self.nome) == 'on'
+        return form.get(self.nome, '').strip()
+
+# Na ordem do formulário (e das colunas da exportação)
+REGISTRO_CAMPOS = {
+    'kart': [
+        Campo('data_nascimento', 'data', obrigatorio=True, mensagem='Data de nascimento é obrigatória.', indexado=True),
+        Campo('cor', indexado=True),
+        Campo('nome_responsavel'),
+        Campo('telefone_responsavel'),
+        Campo('tem_condicoes_logistica', obrigatorio=True, mensagem='Informe se tem condições de logística.', indexado=True),
+        Campo('categoria', obrigatorio=True, mensagem='Selecione a categoria.', indexado=True),
+        Campo('peso', 'decimal'),
+        Campo('altura', 'decimal'),
+        Campo('vestuario', 'lista', indexado=True),
+        Campo('categoria_atual'),
+        Campo('titulos_resultados'),
+        Campo('autorizacao_responsavel', 'booleano', indexado=True),
+    ],
+    'imersao': [
+        Campo('cidade', indexado=True),
+        Campo('escolaridade', indexado=True),
+        Campo('participou_antes', indexado=True),
+        Campo('como_ficou_sabendo'),
+        Campo('modulo_interesse', indexado=True),
+    ],
+    'estagio-motorsport': [
+        Campo('data_nascimento', 'data', indexado=True),
+        Campo('identidade_genero', indexado=True),
+        Campo('cor', indexado=True),
+        Campo('participou_fia_got', indexado=True),
+        Campo('area_atuacao', indexado=True),
+        Campo('ativacoes', 'lista', indexado=True),
+        Campo('ordem_preferencia'),
+        Campo('tem_cnh', indexado=True),
+        Campo('linkedin'),
+        Campo('mini_bio'),
+        Campo('porque_importante'),
+        Campo('como_ficou_sabendo'),
+        Campo(
+            'concordo_compartilhamento', 'booleano', obrigatorio=True,
+            mensagem='Você precisa concordar com o compartilhamento de dados.'
+        ),
+    ],
+    'e-sports': [
+        Campo('idade', 'inteiro', indexado=True, minimo=14, maximo=99),
+        Campo('cidade', indexado=True),
+        Campo('nickname'),
+        Campo('plataforma', indexado=True),
+        Campo('experiencia'),
+    ]
+}
+
+CAMPOS_INDEXADOS = {campo.nome for campos in REGISTRO_CAMPOS.values() for campo in campos if campo.indexado}
+
+# Comuns a todos os programas, gravados em colunas próprias da inscrição
+CAMPOS_COMUNS = [
+    Campo('nome', obrigatorio=True, mensagem='Nome é obrigatório.', maximo=200),
+    Campo('email', 'email', obrigatorio=True, mensagem='Email inválido.', maximo=200),
+    Campo('telefone', obrigatorio=True, mensagem='Telefone é obrigatório.', maximo=50),
+    Campo('estado', 'uf', obrigatorio=True, mensagem='Estado (UF) é obrigatório.'),
+]
+
+class Arquivo:
+    """Arquivo enviado com a inscrição, gravado em `Inscricao.<nome>_filename`."""
+
+    def __init__(self, nome, tipos, obrigatorio=False, mensagem=None):
+        self.nome = nome
+        self.tipos = tipos  # 'img' e/ou 'pdf', conferidos pelo conteúdo (ver ASSINATURAS)
+        self.obrigatorio = obrigatorio
+        self.mensagem = mensagem or f'{nome.title()} é obrigatório.'
+
+REGISTRO_ARQUIVOS = {
+    'kart': [
+        Arquivo('foto', ['img'], obrigatorio=True, mensagem='Foto é obrigatória.'),
+    ],
+    'estagio-motorsport': [
+        Arquivo('foto', ['img'], obrigatorio=True, mensagem='Foto é obrigatória.'),
+        Arquivo('curriculo', ['pdf']),
+    ],
+}
+
+# VALIDAÇÃO
+# Cada conversor recebe o campo e o valor já lido do formulário (não vazio) e
+# devolve o valor a gravar em campos_extras, ou levanta ValueError com a
+# mensagem para o usuário.
+def converter_texto(campo: Campo, valor: str):
+    if campo.maximo and len(valor) > campo.maximo:
+        raise ValueError(f'{campo.rotulo}: use no máximo {campo.maximo} caracteres.')
+    return valor
+
+def converter_data(campo: Campo, valor: str):
+    try:
+        data = date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f'{campo.rotulo}: data inválida.')
+    if not date(1900, 1, 1) <= data <= date.today():
+        raise ValueError(f'{campo.rotulo}: data fora do intervalo permitido.')
+    return data.isoformat()
+
+def limitar_numero(campo: Campo, numero):
+    if campo.minimo is not None and numero < campo.minimo:
+        raise ValueError(f'{campo.rotulo}: o mínimo é {campo.minimo}.')
+    if campo.maximo is not None and numero > campo.maximo:
+        raise ValueError(f'{campo.rotulo}: o máximo é {campo.maximo}.')
+    return numero
+
+def converter_inteiro(campo: Campo, valor: str):
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ValueError(f'{campo.rotulo}: informe um número inteiro.')
+    return limitar_numero(campo, numero)
+
+def converter_decimal(campo: Campo, valor: str):
+    encontrado = NUMERO.fullmatch(valor)
+    if not encontrado:
+        raise ValueError(f'{campo.rotulo}: informe um número.')
+    numero = float(encontrado.group(1).replace(',', '.'))
+    return limitar_numero(campo, int(numero) if numero.is_integer() else numero)
+
+def converter_lista(campo: Campo, valores: list):
+    itens = []
+    for valor in valores:
+        valor = valor.strip()
+        if valor and valor not in itens:
+            itens.append(valor)
+    return itens
+
+def converter_email(campo: Campo, valor: str):
+    if not EMAIL_VALIDO.fullmatch(valor) or (campo.maximo and len(valor) > campo.maximo):
+        raise ValueError(campo.mensagem or f'{campo.rotulo}: email inválido.')
+    return valor
+
+def converter_uf(campo: Campo, valor: str):
+    valor = valor.upper()
+    if valor not in UFS:
+        raise ValueError(campo.mensagem or f'{campo.rotulo}: UF inválida.')
+    return valor
+
+CONVERSORES = {
+    'texto': converter_texto,
+    'data': converter_data,
+    'lista': converter_lista,
+    'booleano': lambda campo, valor: valor,
+    'inteiro': converter_inteiro,
+    'decimal': converter_decimal,
+    'email': converter_email,
+    'uf': converter_uf,
+}
+
+class Esquema:
+    """Validação completa do formulário de um programa, montada uma vez.
+
+    `validar` lê campos comuns, campos do programa e arquivos, converte os
+    tipos e junta todos os erros numa única passada. Os arquivos têm o tipo
+    conferido pelos primeiros bytes, sem gravar nada: quem chama só toca no
+    banco ou no disco se não houver erros.
+    """
+
+    def __init__(self, campos: list, arquivos: list):
+        self.campos_comuns = [self.compilar(campo) for campo in CAMPOS_COMUNS]
+        self.campos = [self.compilar(campo) for campo in campos]
+        self.arquivos = arquivos
+        self.conhecidos = (
+            {campo.nome for campo in CAMPOS_COMUNS + campos} | {arquivo.nome for arquivo in arquivos} | {'token_envio'}
+        )
+
+    @staticmethod
+    def compilar(campo: Campo) -> tuple:
+        obrigatorio = (campo.mensagem or f'{campo.rotulo} é obrigatório.') if campo.obrigatorio else None
+        return campo.nome, campo.ler, partial(CONVERSORES[campo.tipo], campo), obrigatorio
+
+    @staticmethod
+    def ler_campos(compilados: list, form, erros: list) -> dict:
+        valores = {}
+        for nome, ler, converter, obrigatorio in compilados:
+            valor = ler(form)
+            if not valor:
+                if obrigatorio:
+                    erros.append(obrigatorio)
+                valores[nome] = valor
+                continue
+            try:
+                valores[nome] = converter(valor)
+            except ValueError as e:
+                erros.append(str(e))
+                valores[nome] = valor
+        return valores
+
+    def validar(self, form, files) -> dict:
+        """Retorna dados comuns, campos_extras, arquivos {nome: (arquivo, extensão)}, erros e campos desconhecidos."""
+        erros = []
+        dados = self.ler_campos(self.campos_comuns, form, erros)
+        campos_extras = self.ler_campos(self.campos, form, erros)
+
+        arquivos = {}
+        for especificacao in self.arquivos:
+            arquivo = files.get(especificacao.nome)
+            if not arquivo:
+                if especificacao.obrigatorio:
+                    erros.append(especificacao.mensagem)
+                continue
+            extensao = extensao_pelo_conteudo(arquivo, especificacao.tipos)
+            if extensao is None:
+                formatos = ' ou '.join(FORMATOS_ARQUIVO[tipo] for tipo in especificacao.tipos)
+                erros.append(f'{especificacao.nome.title()}: envie um arquivo {formatos}.')
+            else:
+                arquivos[especificacao.nome] = (arquivo, extensao)
+
+        desconhecidos = sorted((set(form) | set(files)) - self.conhecidos)
+        return {
+            'dados': dados,
+            'campos_extras': campos_extras,
+            'arquivos': arquivos,
+            'erros': erros,
+            'desconhecidos': desconhecidos
+        }
+
+_esquemas = {}
+
+def esquema_programa(slug: str) -> Esquema:
+    """Esquema compilado do programa (programas sem registro têm só os campos comuns)."""
+    if slug not in _esquemas:
+        _esquemas[slug] = Esquema(REGISTRO_CAMPOS.get(slug, []), REGISTRO_ARQUIVOS.get(slug, []))
+    return _esquemas[slug]
+
+def converter_campos_existentes():
+    """Converte para o tipo registrado os campos_extras gravados antes da validação por tipo.
+
+    Valores que não puderem ser convertidos ficam como estão.
+    """
+    numericos = {
+        slug: [campo for campo in campos if campo.tipo in ('inteiro', 'decimal')]
+        for slug, campos in REGISTRO_CAMPOS.items()
+    }
+    slugs = {p.id: p.slug for p in Programa.query.all()}
+    consulta = Inscricao.query.options(load_only(Inscricao.programa_id, Inscricao.campos_extras))
+    atualizacoes = []
+    for inscricao in iterar_em_lotes(consulta):
+        campos_extras = dict(inscricao.campos_extras or {})
+        alterado = False
+        for campo in numericos.get(slugs.get(inscricao.programa_id), []):
+            valor = campos_extras.get(campo.nome)
+            if not isinstance(valor, str) or not valor.strip():
+                continue
+            try:
+                campos_extras[campo.nome] = CONVERSORES[campo.tipo](campo, valor.strip())
+                alterado = True
+            except ValueError:
+                pass
+        if alterado:
+            atualizacoes.append({'id': inscricao.id, 'campos_extras': campos_extras})
+        if len(atualizacoes) >= 1000:
+            db.session.execute(update(Inscricao), atualizacoes)
+            atualizacoes = []
+    if atualizacoes:
+        db.session.execute(update(Inscricao), atualizacoes)
+    db.session.expire_all()
+
+def linhas_indexadas(slug: str, campos_extras: dict) -> list:
+    """Valores dos campos indexados, um CampoIndexado por valor (listas geram vários)."""
+    linhas = []
+    for campo in REGISTRO_CAMPOS.get(slug, []):
+        if not campo.indexado:
+            continue
+        valor = (campos_extras or {}).get(campo.nome)
+        if campo.tipo == 'booleano':
+            valores = ['sim' if valor else 'nao']
+        elif isinstance(valor, list):
+            valores = [v for v in valor if v]
+        else:
+            valores = [valor] if valor not in (None, '') else []
+
+        for item in valores:
+            linha = CampoIndexado(campo=campo.nome, valor_texto=str(item)[:255])
+            if campo.tipo == 'data':
+                try:
+                    linha.valor_data = date.fromisoformat(str(item))
+                except ValueError:
+                    pass
+            linhas.append(linha)
+    return linhas
+
+def indexar_campos(inscricao: Inscricao, slug: str):
+    """Grava os campos indexados da inscrição (na transação corrente)."""
+    for linha in linhas_indexadas(slug, inscricao.campos_extras):
+        linha.programa_id = inscricao.programa_id
+        inscricao.campos_indexados.append(linha)
+
+def popular_campos_indexados():
+    """Reconstrói campos_indexados a partir do campos_extras de todas as inscrições."""
+    CampoIndexado.query.delete()
+    slugs = {p.id: p.slug for p in Programa.query.all()}
+    consulta = Inscricao.query.options(load_only(Inscricao.programa_id, Inscricao.campos_extras))
+    for inscricao in iterar_em_lotes(consulta):
+        for linha in linhas_indexadas(slugs.get(inscricao.programa_id), inscricao.campos_extras):
+            linha.inscricao_id = inscricao.id
+            linha.programa_id = inscricao.programa_id
+            db.session.add(linha)
+        if len(db.session.new) >= 1000:
+            db.session.flush()
+
+def normalizar_valor_chave(valor) -> str:
+    if isinstance(valor, list):
+        valor = ','.join(sorted(str(v) for v in valor))
+    return ' '.join(str(valor or '').split()).lower()
+
+def chave_unica(dados: dict) -> str:
+    """Chave normalizada da inscrição segundo INSCRICAO_CHAVE_UNICA (None se desligada).
+
+    `dados` traz os campos comuns e os campos_extras. Chaves compostas muito
+    longas são reduzidas ao SHA-256.
+    """
+    campos = [c.strip() for c in current_app.config['INSCRICAO_CHAVE_UNICA'].split(',') if c.strip()]
+    if not campos or campos == ['nenhuma']:
+        return None
+    valores = [normalizar_valor_chave(dados.get(campo)) for campo in campos]
+    if not any(valores):
+        return None
+    chave = '|'.join(valores)
+    if len(chave) > 255:
+        chave = hashlib.sha256(chave.encode('utf-8')).hexdigest()
+    return chave
+
+def dados_chave(inscricao: Inscricao) -> dict:
+    dados = dict(inscricao.campos_extras or {})
+    dados.update(nome=inscricao.nome, email=inscricao.email, telefone=inscricao.telefone, estado=inscricao.estado)
+    return dados
+
+def popular_chaves_unicas():
+    """Recalcula chave_unica de todas as inscrições.
+
+    Quando já existem duplicadas, só a mais antiga de cada grupo recebe a
+    chave; as demais ficam com NULL (e continuam visíveis no painel).
+    """
+    db.session.execute(update(Inscricao).values(chave_unica=None))
+    vistas = set()
+    atualizacoes = []
+    consulta = Inscricao.query.options(load_only(
+        Inscricao.nome, Inscricao.email, Inscricao.telefone, Inscricao.estado,
+        Inscricao.programa_id, Inscricao.campos_extras
+    ))
+    for inscricao in iterar_em_lotes(consulta):
+        chave = chave_unica(dados_chave(inscricao))
+        if chave is None or (inscricao.programa_id, chave) in vistas:
+            continue
+        vistas.add((inscricao.programa_id, chave))
+        atualizacoes.append({'id': inscricao.id, 'chave_unica': chave})
+        if len(atualizacoes) >= 1000:
+            db.session.execute(update(Inscricao), atualizacoes)
+            atualizacoes = []
+    if atualizacoes:
+        db.session.execute(update(Inscricao), atualizacoes)
+    db.session.expire_all()
+
+def inscricao_existente(programa_id: int, token: str, chave: str, email: str):
+    """Inscrição já gravada pelo mesmo formulário ou com a mesma chave.
+
+    O token só identifica um reenvio se for do mesmo programa e da mesma
+    pessoa (mesma chave única ou, sem ela, mesmo email): o mesmo formulário
+    reenviado pelo botão Voltar com outros dados é uma inscrição nova.
+    """
+    if token:
+        existente = Inscricao.query.filter_by(token_envio=token, programa_id=programa_id).first()
+        if existente and (
+            (chave is not None and existente.chave_unica == chave)
+            or normalizar_valor_chave(existente.email) == normalizar_valor_chave(email)
+        ):
+            return existente
+    if chave:
+        return Inscricao.query.filter_by(programa_id=programa_id, chave_unica=chave).first()
+    return None
+
+def token_em_uso(token: str) -> bool:
+    return db.session.query(Inscricao.query.filter_by(token_envio=token).exists()).scalar()
+
+def agregar_campos(programa_id: int) -> dict:
+    """Contagem por valor de cada campo indexado do programa, em um único GROUP BY."""
+    linhas = (
+        db.session.query(CampoIndexado.campo, CampoIndexado.valor_texto, func.count(CampoIndexado.inscricao_id))
+        .filter(CampoIndexado.programa_id == programa_id)
+        .group_by(CampoIndexado.campo, CampoIndexado.valor_texto)
+        .order_by(CampoIndexado.campo, func.count(CampoIndexado.inscricao_id).desc())
+        .all()
+    )
+    agregado = {}
+    for campo, valor, total in linhas:
+        agregado.setdefault(campo, []).append((valor, total))
+    return agregado
+
+def data_limite_menor_idade(hoje: date = None) -> date:
+    """Quem nasceu depois desta data ainda não tem 18 anos."""
+    hoje = hoje or date.today()
+    try:
+        return hoje.replace(year=hoje.year - 18)
+    except ValueError:  # 29 de fevereiro
+        return hoje.replace(year=hoje.year - 18, day=28)
@@ -0,0 +1,333 @@
+import os
+import time
+from datetime import datetime
+
+import click
+from flask import Blueprint, current_app
+from werkzeug.security import generate_password_hash
+
+from .arquivamento import (
+    STATUS_FINAIS, arquivar_programa, consulta_arquivaveis, expurgar_ciclo, expurgar_uploads_frios, listar_ciclos,
+    nome_ciclo, programas_encerrados
+)
+from .backup import criar_backup, ler_manifesto, listar_backups, podar_backups, restaurar_backup, verificar_backup
+from .banco import banco_sqlite, iterar_em_lotes, recalcular_contadores
+from .cache import invalidar_conteudo_publico
+from .campos import popular_campos_indexados, popular_chaves_unicas
+from .consultas import consulta_pagina, consulta_painel
+from .emails import ConexaoSMTP, processar_fila_emails
+from .limites import REGRAS_LIMITE, ler_limite, obter_baldes
+from .migracoes import MIGRACOES, aplicar_migracoes
+from .modelos import db, AdminUser, Aviso, CampoIndexado, ConfiguracaoEmail, EmailFila, Inscricao, Programa
+from .profiling import gravar_metricas
+from .uploads import DERIVADOS_TAMANHOS, caminho_derivado, gerar_derivados
+
+# COMANDOS CLI
+# Registrados direto no grupo `flask` (cli_group=None), já com app context.
+bp = Blueprint('cli', __name__, cli_group=None)
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Inicializa o banco de dados."""
+    for versao, descricao in aplicar_migracoes():
+        print(f'✅ Migração {versao} aplicada: {descricao}')
+    if not AdminUser.query.first():
+        email = os.environ.get('ADMIN_EMAIL', 'admin@example.com')
+        senha = os.environ.get('ADMIN_PASSWORD', 'admin123')
+        admin = AdminUser(
+            email=email,
+            password_hash=generate_password_hash(senha)
+        )
+        db.session.add(admin)
+        print(f'✅ Admin criado: {email}')
+
+    programas_padrao = [
+        ('Estágio Motorsport', 'estagio-motorsport'),
+        ('Imersão para Mulheres no Motorsport', 'imersao'),
+        ('Seletiva de Kart FIA Girls on Track Brasil', 'kart'),
+        ('Campeonato de E-Sports FIA Girls on Track Brasil', 'e-sports')
+    ]
+    for nome, slug in programas_padrao:
+        if not Programa.query.filter_by(slug=slug).first():
+            p = Programa(
+                nome=nome,
+                slug=slug,
+                descricao=f'Descrição padrão para {nome}.',
+                ativo=True
+            )
+            db.session.add(p)
+            print(f'✅ Programa criado: {nome}')
+
+    if not ConfiguracaoEmail.query.first():
+        db.session.add(ConfiguracaoEmail())
+
+    db.session.commit()
+    recalcular_contadores()
+    invalidar_conteudo_publico()
+    print('✅ Banco de dados inicializado!')
+
+@bp.cli.command('migrar')
+def migrar_command():
+    """Aplica as migrações de schema pendentes ao banco existente."""
+    novas = aplicar_migracoes()
+    for versao, descricao in novas:
+        print(f'✅ Migração {versao} aplicada: {descricao}')
+    if not novas:
+        print('Banco de dados já está atualizado.')
+
+# Consultas quentes verificadas por `flask verificar-indices`
+CONSULTAS_VERIFICADAS = [
+    ('painel sem filtros', {}),
+    ('painel por programa', {'programa_id': '1'}),
+    ('painel por status', {'status': 'pendente'}),
+    ('painel por estado', {'estado': 'SP'}),
+    ('painel por programa e status', {'programa_id': '1', 'status': 'pendente'}),
+    ('painel, página seguinte', {'programa_id': '1', 'apos': '2026-01-01T00:00:00_1000'}),
+]
+
+def plano_consulta(query) -> list:
+    """Executa EXPLAIN QUERY PLAN na consulta e retorna as linhas do plano."""
+    compilado = query.statement.compile(dialect=db.engine.dialect)
+    parametros = tuple(compilado.params[nome] for nome in compilado.positiontup)
+    linhas = db.session.connection().exec_driver_sql(
+        'EXPLAIN QUERY PLAN ' + str(compilado), parametros
+    ).all()
+    return [linha[-1] for linha in linhas]
+
+def problemas_plano(plano: list, tabela: str) -> list:
+    """Linhas do plano que indicam varredura completa ou ordenação sem índice."""
+    problemas = []
+    for linha in plano:
+        if linha.startswith(f'SCAN {tabela}') and 'USING' not in linha:
+            problemas.append(linha)
+        if 'TEMP B-TREE' in linha:
+            problemas.append(linha)
+    return problemas
+
+@bp.cli.command('verificar-indices')
+def verificar_indices_command():
+    """Mostra o plano das consultas do painel e falha se alguma não usar índice."""
+    if not banco_sqlite():
+        raise click.ClickException('A verificação usa EXPLAIN QUERY PLAN e só funciona com SQLite.')
+    consultas = []
+    for descricao, filtros in CONSULTAS_VERIFICADAS:
+        query = consulta_pagina(consulta_painel(filtros), filtros.get('apos'), 51)
+        consultas.append((descricao, query, 'inscricoes'))
+    consultas.append((
+        'avisos ativos do programa',
+        Aviso.query.filter_by(programa_id=1, ativo=True),
+        'avisos'
+    ))
+
+    falhas = 0
+    for descricao, query, tabela in consultas:
+        plano = plano_consulta(query)
+        problemas = problemas_plano(plano, tabela)
+        print(f"{'❌' if problemas else '✅'} {descricao}")
+        for linha in plano:
+            print(f'    {linha}')
+        falhas += bool(problemas)
+
+    if falhas:
+        raise click.ClickException(f'{falhas} consulta(s) sem índice adequado. Execute `flask migrar`.')
+
+@bp.cli.command('gerar-miniaturas')
+def gerar_miniaturas_command():
+    """Gera os derivados webp das fotos que ainda não os têm."""
+    geradas = 0
+    query = Inscricao.query.filter(Inscricao.foto_filename.isnot(None))
+    for inscricao in iterar_em_lotes(query):
+        if all(os.path.exists(caminho_derivado(inscricao.foto_filename, t)) for t in DERIVADOS_TAMANHOS):
+            continue
+        try:
+            gerar_derivados(inscricao.foto_filename)
+            geradas += 1
+        except OSError as e:
+            print(f'Erro na foto da inscrição {inscricao.id}:', e)
+    print(f'✅ Derivados gerados para {geradas} foto(s).')
+
+@bp.cli.command('indexar-campos')
+def indexar_campos_command():
+    """Reconstrói a tabela campos_indexados a partir das inscrições."""
+    popular_campos_indexados()
+    db.session.commit()
+    print(f'✅ {CampoIndexado.query.count()} valor(es) indexado(s).')
+
+@bp.cli.command('recalcular-chaves')
+def recalcular_chaves_command():
+    """Recalcula a chave única das inscrições (após mudar INSCRICAO_CHAVE_UNICA)."""
+    popular_chaves_unicas()
+    db.session.commit()
+    com_chave = Inscricao.query.filter(Inscricao.chave_unica.isnot(None)).count()
+    print(f'✅ Chaves recalculadas: {com_chave} inscrição(ões) com chave.')
+
+@bp.cli.command('limites')
+@click.option('--limpar', is_flag=True, help='Esvazia os baldes e zera os contadores.')
+def limites_command(limpar):
+    """Mostra os limites por IP configurados e quantas requisições foram recusadas."""
+    baldes = obter_baldes()
+    if limpar:
+        baldes.limpar()
+        print('✅ Baldes e contadores de rejeição zerados.')
+        return
+    print(f"Backend: {current_app.config['LIMITE_BACKEND']} | Ativos: {'sim' if current_app.config['LIMITES_ATIVOS'] else 'não'}")
+    rejeicoes = baldes.rejeicoes()
+    for regra, _, _, config in REGRAS_LIMITE:
+        capacidade, periodo = ler_limite(current_app.config[config])
+        print(f'{regra}: {capacidade} a cada {periodo:g}s por IP | recusadas: {rejeicoes.get(regra, 0)}')
+
+@bp.cli.command('recalcular-estatisticas')
+def recalcular_estatisticas_command():
+    """Reconstrói a tabela de contadores de status do painel."""
+    recalcular_contadores()
+    print('✅ Contadores de status recalculados!')
+
+@bp.cli.command('processar-emails')
+@click.option('--continuo', is_flag=True, help='Mantém o processamento em loop.')
+@click.option('--intervalo', default=10, show_default=True, help='Segundos entre lotes no modo contínuo.')
+@click.option('--lote', default=None, type=int, help='Quantidade máxima de emails por lote.')
+@click.option('--reprocessar-falhas', is_flag=True, help='Devolve para a fila os emails que falharam.')
+def processar_emails_command(continuo, intervalo, lote, reprocessar_falhas):
+    """Envia os emails pendentes da fila.
+
+    Execute uma única instância deste comando (cron ou serviço) para evitar
+    envios duplicados.
+    """
+    if reprocessar_falhas:
+        total = EmailFila.query.filter_by(status='falhou').update({
+            'status': 'pendente',
+            'tentativas': 0,
+            'proxima_tentativa_em': datetime.utcnow()
+        })
+        db.session.commit()
+        print(f'🔁 {total} email(s) devolvido(s) para a fila.')
+
+    conexao = ConexaoSMTP.do_ambiente()
+    if conexao is None:
+        pendentes = EmailFila.query.filter_by(status='pendente').count()
+        print(f'SMTP não configurado. {pendentes} email(s) permanecem na fila.')
+        return
+
+    try:
+        while True:
+            resultado = processar_fila_emails(conexao, lote)
+            if resultado['enviados'] or resultado['falhas']:
+                print(f"📧 Enviados: {resultado['enviados']} | Falhas: {resultado['falhas']}")
+                if current_app.config['PROFILING_ATIVO']:
+                    gravar_metricas(forcar=True)
+            if not continuo:
+                break
+            if resultado['falhas'] or not resultado['enviados']:
+                # Fila vazia ou servidor com problemas: libera a conexão e espera
+                conexao.fechar()
+                time.sleep(intervalo)
+    finally:
+        conexao.fechar()
+
+# BACKUP (ver fiagot/backup.py)
+@bp.cli.command('backup')
+@click.option('--paginas', default=1024, show_default=True, help='Páginas do banco copiadas por passo.')
+@click.option('--pausa', default=0.0, show_default=True, help='Segundos de pausa entre os passos.')
+@click.option('--manter', default=None, type=click.IntRange(min=1), help='Mantém só os N backups mais recentes.')
+@click.option('--listar', is_flag=True, help='Apenas lista os backups existentes.')
+def backup_command(paginas, pausa, manter, listar):
+    """Copia o banco e os uploads novos para BACKUP_FOLDER, sem parar o site.
+
+    Pode rodar de hora em hora pelo cron: só os uploads ainda não copiados
+    são gravados de novo.
+    """
+    if listar:
+        for nome in listar_backups():
+            manifesto = ler_manifesto(nome)
+            print(f"{nome} | banco: {manifesto['banco']['tamanho'] / 1e6:.1f} MB | uploads: {len(manifesto['uploads'])}")
+        return
+    if not banco_sqlite():
+        raise click.ClickException('O backup usa a API de backup do SQLite; para outros bancos use a ferramenta do servidor.')
+
+    nome, manifesto = criar_backup(paginas, pausa)
+    banco = manifesto['banco']
+    print(f"✅ Backup {nome}: banco com {banco['paginas']} páginas em {banco['passos']} passo(s) | "
+          f"{len(manifesto['uploads'])} upload(s), {manifesto['objetos_novos']} novo(s) | "
+          f"{manifesto['duracao_segundos']:.2f}s")
+    if manter:
+        removidos, apagados = podar_backups(manter)
+        if removidos:
+            print(f'🗑️ {len(removidos)} backup(s) antigo(s) removido(s), {apagados} arquivo(s) sem uso apagado(s).')
+
+@bp.cli.command('verificar-backup')
+@click.argument('nome', required=False)
+@click.option('--completo', is_flag=True, help='Recalcula o hash de cada upload (mais lento).')
+def verificar_backup_command(nome, completo):
+    """Confere a integridade de um backup (o mais recente, se não informado)."""
+    nome = nome or (listar_backups() or [None])[-1]
+    if nome not in listar_backups():
+        raise click.ClickException('Backup não encontrado.')
+    problemas = verificar_backup(nome, completo)
+    for problema in problemas:
+        print(f'❌ {problema}')
+    if problemas:
+        raise click.ClickException(f'{len(problemas)} problema(s) no backup {nome}.')
+    print(f'✅ Backup {nome} íntegro.')
+
+@bp.cli.command('restaurar-backup')
+@click.argument('nome')
+@click.option('--sim', is_flag=True, help='Não pede confirmação.')
+def restaurar_backup_command(nome, sim):
+    """Restaura o banco e os uploads de um backup, após verificá-lo."""
+    if nome not in listar_backups():
+        raise click.ClickException('Backup não encontrado.')
+    if not banco_sqlite():
+        raise click.ClickException('A restauração só funciona com SQLite.')
+    problemas = verificar_backup(nome)
+    if problemas:
+        raise click.ClickException(f'Backup {nome} com problemas: ' + '; '.join(problemas[:5]))
+    if not sim:
+        click.confirm(f'Substituir o banco atual pelo backup {nome}?', abort=True)
+
+    resultado = restaurar_backup(nome)
+    invalidar_conteudo_publico()
+    print(f"✅ Backup {nome} restaurado ({resultado['uploads_restaurados']} upload(s) recuperado(s)).")
+    if resultado['versao_schema'] != max(versao for versao, _, _ in MIGRACOES):
+        print('Execute `flask migrar` para atualizar o schema do banco restaurado.')
+
+# ARQUIVAMENTO E LGPD (ver fiagot/arquivamento.py)
+@bp.cli.command('arquivar')
+@click.option('--programa', 'slug', default=None, help='Arquiva só o programa com este slug.')
+@click.option('--simular', is_flag=True, help='Só mostra quantas inscrições seriam arquivadas.')
+def arquivar_command(slug, simular):
+    """Move as inscrições finalizadas dos programas encerrados para os arquivos por ciclo."""
+    programas = programas_encerrados(current_app.config['ARQUIVO_CARENCIA_DIAS'], slug)
+    if not programas:
+        print('Nenhum programa encerrado há mais de '
+              f"{current_app.config['ARQUIVO_CARENCIA_DIAS']} dia(s).")
+        return
+    for programa in programas:
+        pendentes = Inscricao.query.filter(
+            Inscricao.programa_id == programa.id, Inscricao.status.notin_(STATUS_FINAIS)
+        ).count()
+        if simular:
+            total = consulta_arquivaveis(programa).count()
+            print(f'{nome_ciclo(programa)}: {total} inscrição(ões) a arquivar, {pendentes} ainda sem decisão.')
+            continue
+        total = arquivar_programa(programa)
+        print(f'📦 {nome_ciclo(programa)}: {total} inscrição(ões) arquivada(s).')
+        if pendentes:
+            print(f'   {pendentes} inscrição(ões) ainda sem decisão final continuam no painel.')
+
+@bp.cli.command('expurgar-lgpd')
+@click.option('--simular', is_flag=True, help='Só mostra o que seria expurgado.')
+def expurgar_lgpd_command(simular):
+    """Apaga os dados pessoais das inscrições arquivadas com retenção vencida."""
+    arquivos = set()
+    total = 0
+    for nome in listar_ciclos():
+        resultado = expurgar_ciclo(nome, simular=simular)
+        for status, quantidade in resultado['por_status'].items():
+            print(f"{'Seriam expurgadas' if simular else '🧹 Expurgadas'} em {nome}: {quantidade} ({status})")
+            total += quantidade
+        arquivos |= resultado['arquivos']
+    if simular:
+        print(f'{total} inscrição(ões) e até {len(arquivos)} arquivo(s) seriam expurgados.')
+        return
+    apagados = expurgar_uploads_frios(arquivos)
+    print(f'✅ {total} inscrição(ões) expurgada(s), {apagados} arquivo(s) apagado(s).')
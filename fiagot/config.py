@@ -0,0 +1,115 @@
+import os
+
+# CONFIGURAÇÃO BÁSICA
+# Lida do ambiente (e do .env) quando o app é criado, não na importação.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fichas em PDF: cache por inscrição e arquivos ZIP dos lotes
+FICHAS_FOLDER = os.path.join(BASE_DIR, 'cache', 'fichas')
+LOTES_FOLDER = os.path.join(BASE_DIR, 'cache', 'lotes')
+
+# Marcador da versão do conteúdo público (programas e avisos)
+VERSAO_CONTEUDO_ARQUIVO = os.path.join(BASE_DIR, 'cache', 'conteudo.versao')
+
+# Métricas do profiling (um arquivo por processo) e baldes do limite por IP
+METRICAS_FOLDER = os.path.join(BASE_DIR, 'cache', 'metricas')
+LIMITES_BANCO = os.path.join(BASE_DIR, 'cache', 'limites.db')
+
+def configuracao_do_ambiente() -> dict:
+    """Configuração do app a partir das variáveis de ambiente."""
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BASE_DIR, '.env'))
+
+    return {
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production'),
+        'SQLALCHEMY_DATABASE_URI': os.environ.get(
+            'DATABASE_URL',
+            'sqlite:///' + os.path.join(BASE_DIR, 'database.db')
+        ),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+
+        # Banco de dados: pool de conexões e tolerância a concorrência de escrita
+        'SQLITE_BUSY_TIMEOUT_MS': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '15000')),
+        'DB_TENTATIVAS_COMMIT': int(os.environ.get('DB_TENTATIVAS_COMMIT', '5')),
+        'DB_POOL_SIZE': int(os.environ.get('DB_POOL_SIZE', '5')),
+        'DB_MAX_OVERFLOW': int(os.environ.get('DB_MAX_OVERFLOW', '10')),
+        'DB_POOL_TIMEOUT': int(os.environ.get('DB_POOL_TIMEOUT', '30')),
+
+        # Upload de arquivos
+        'UPLOAD_FOLDER': os.path.join(BASE_DIR, 'static', 'uploads'),
+        'MAX_CONTENT_LENGTH': 25 * 1024 * 1024,  # 25 MB
+
+        # Derivados das fotos (miniatura e webp), gerados em segundo plano
+        'DERIVADOS_FOLDER': os.path.join(BASE_DIR, 'static', 'derivados'),
+
+        # Backups do banco e dos uploads (`flask backup`)
+        'BACKUP_FOLDER': os.environ.get('BACKUP_FOLDER', os.path.join(BASE_DIR, 'backups')),
+
+        # Arquivamento dos ciclos encerrados (`flask arquivar`), depois de
+        # ARQUIVO_CARENCIA_DIAS do fechamento, e retenção LGPD (`flask
+        # expurgar-lgpd`): meses após o fechamento até apagar os dados pessoais.
+        # Os backups guardam cópias; mantenha a poda (`flask backup --manter`)
+        # dentro do mesmo prazo. A pasta do arquivo deve ter backup próprio.
+        'ARQUIVO_FOLDER': os.environ.get('ARQUIVO_FOLDER', os.path.join(BASE_DIR, 'arquivo')),
+        'ARQUIVO_CARENCIA_DIAS': int(os.environ.get('ARQUIVO_CARENCIA_DIAS', '30')),
+        'LGPD_MESES_NAO_SELECIONADAS': int(os.environ.get('LGPD_MESES_NAO_SELECIONADAS', '12')),
+        'LGPD_MESES_SELECIONADAS': int(os.environ.get('LGPD_MESES_SELECIONADAS', '60')),
+
+        'FICHAS_PROCESSOS': int(os.environ.get('FICHAS_PROCESSOS', os.cpu_count() or 2)),
+
+        # Chave de inscrição única por programa: 'email' ou campos separados por
+        # vírgula (ex.: 'email,data_nascimento'); 'nenhuma' desliga a verificação.
+        # Depois de mudar, rode `flask recalcular-chaves`.
+        'INSCRICAO_CHAVE_UNICA': os.environ.get('INSCRICAO_CHAVE_UNICA', 'email'),
+
+        # Painel admin
+        'ADMIN_POR_PAGINA': int(os.environ.get('ADMIN_POR_PAGINA', '50')),
+
+        # Novidades do painel em tempo real (/admin/eventos), desligadas por
+        # padrão: cada painel aberto mantém uma conexão por até
+        # ADMIN_EVENTOS_DURACAO segundos e consulta as linhas novas a cada
+        # ADMIN_EVENTOS_INTERVALO. Com workers síncronos do gunicorn cada aba
+        # ocupa um worker inteiro; só ligue com workers com threads (ex.:
+        # `--threads 8`) ou assíncronos.
+        'ADMIN_EVENTOS_INTERVALO': float(os.environ.get('ADMIN_EVENTOS_INTERVALO', '3')),
+        'ADMIN_EVENTOS_DURACAO': int(os.environ.get('ADMIN_EVENTOS_DURACAO', '0')),
+        'ADMIN_EVENTOS_LOTE': int(os.environ.get('ADMIN_EVENTOS_LOTE', '100')),
+
+        # Fila de emails (processada por `flask processar-emails`)
+        'EMAIL_LOTE': int(os.environ.get('EMAIL_LOTE', '50')),
+        'EMAIL_MAX_TENTATIVAS': int(os.environ.get('EMAIL_MAX_TENTATIVAS', '8')),
+        'EMAIL_BACKOFF_SEGUNDOS': int(os.environ.get('EMAIL_BACKOFF_SEGUNDOS', '60')),
+
+        # Profiling por requisição (desligado por padrão; ver fiagot/profiling.py)
+        'PROFILING_ATIVO': os.environ.get('PROFILING_ATIVO', '').lower() in ('1', 'true', 'sim'),
+        'PROFILING_REPETICOES_N1': int(os.environ.get('PROFILING_REPETICOES_N1', '5')),
+        'METRICAS_TOKEN': os.environ.get('METRICAS_TOKEN'),
+
+        # Limite de requisições por IP nos POSTs públicos, no formato
+        # 'quantidade/segundos' (ver fiagot/limites.py). Desligado por padrão:
+        # atrás de um proxy reverso todos chegam com o IP do proxy, então ao
+        # ligar informe também LIMITE_PROXIES_CONFIAVEIS (quantos proxies
+        # acrescentam o X-Forwarded-For), senão o limite vale para o site todo.
+        'LIMITES_ATIVOS': os.environ.get('LIMITES_ATIVOS', '').lower() in ('1', 'true', 'sim'),
+        'LIMITE_BACKEND': os.environ.get('LIMITE_BACKEND', 'sqlite'),  # sqlite, memoria ou redis://...
+        'LIMITE_PROXIES_CONFIAVEIS': int(os.environ.get('LIMITE_PROXIES_CONFIAVEIS', '0')),
+        'LIMITE_INSCRICAO': os.environ.get('LIMITE_INSCRICAO', '10/600'),
+        'LIMITE_LOGIN': os.environ.get('LIMITE_LOGIN', '5/300'),
+    }
+
+def opcoes_engine(config) -> dict:
+    """Opções do engine do SQLAlchemy conforme o banco configurado."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    opcoes = {'pool_pre_ping': True}
+    if ':memory:' not in uri and uri != 'sqlite://':
+        opcoes.update({
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+        })
+    if uri.startswith('sqlite'):
+        # O driver espera o lock por conta própria antes de desistir
+        opcoes['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    else:
+        opcoes['pool_recycle'] = 1800
+    return opcoes
@@ -0,0 +1,335 @@
+import re
+from datetime import datetime
+
+from sqlalchemy import and_, column, func, insert, inspect, literal, or_, select, text, update
+from sqlalchemy.orm import defer, joinedload
+
+from .banco import ajustar_contador, executar_com_retentativa, inscricoes_busca
+from .campos import CAMPOS_INDEXADOS, REGISTRO_CAMPOS, data_limite_menor_idade
+from .emails import MENSAGENS_STATUS, contexto_email, modelo_status
+from .modelos import (
+    db, CHAVES_ESTATISTICAS, STATUS_VALIDOS, CampoIndexado, ContadorStatus, HistoricoStatus, EmailFila,
+    Inscricao, Programa
+)
+
+# CONSULTAS DO PAINEL
+_busca_textual_disponivel = False
+
+def busca_textual_disponivel() -> bool:
+    """Indica se o índice FTS5 existe (criado pela migração 2)."""
+    global _busca_textual_disponivel
+    if not _busca_textual_disponivel:
+        _busca_textual_disponivel = inspect(db.engine).has_table('inscricoes_busca')
+    return _busca_textual_disponivel
+
+def termos_busca(texto: str) -> str:
+    """Converte o texto digitado em uma consulta FTS5 por prefixo de cada palavra."""
+    palavras = re.findall(r'\w+', texto or '')
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+def literal_tabela_busca():
+    return column('inscricoes_busca', is_literal=True)
+
+def consulta_busca(texto: str):
+    """Subconsulta (inscricao_id, relevancia) das inscrições que casam com a busca.
+
+    Menor relevância é melhor (bm25); o nome pesa mais que o email, que pesa
+    mais que os campos extras.
+    """
+    relevancia = func.bm25(literal_tabela_busca(), 10.0, 5.0, 1.0)
+    return (
+        select(inscricoes_busca.c.rowid.label('inscricao_id'), relevancia.label('relevancia'))
+        .where(text('inscricoes_busca MATCH :termos').bindparams(termos=termos_busca(texto)))
+        .subquery()
+    )
+
+def filtrar_busca(query, texto: str):
+    """Restringe a consulta às inscrições que casam com a busca textual."""
+    if not termos_busca(texto):
+        return query
+    if not busca_textual_disponivel():
+        return query.filter(or_(Inscricao.nome.ilike(f'%{texto}%'), Inscricao.email.ilike(f'%{texto}%')))
+    return query.filter(Inscricao.id.in_(select(consulta_busca(texto).c.inscricao_id)))
+
+def filtrar_inscricoes(query, filtros):
+    """Aplica os filtros do painel (programa, busca, status, estado, campos) à consulta."""
+    programa_id = filtros.get('programa_id')
+    busca = filtros.get('busca')
+    status = filtros.get('status')
+    estado = filtros.get('estado')
+
+    if programa_id and programa_id.isdigit():
+        query = query.filter(Inscricao.programa_id == int(programa_id))
+    if busca:
+        query = filtrar_busca(query, busca)
+    if status in STATUS_VALIDOS:
+        query = query.filter(Inscricao.status == status)
+    if estado:
+        query = query.filter(Inscricao.estado == estado.upper())
+
+    # Campos extras indexados: campo_<nome>=valor e menor_idade=1
+    for chave, valor in filtros.items():
+        if chave.startswith('campo_') and valor and chave[6:] in CAMPOS_INDEXADOS:
+            query = query.filter(Inscricao.id.in_(
+                select(CampoIndexado.inscricao_id)
+                .where(CampoIndexado.campo == chave[6:], CampoIndexado.valor_texto == valor)
+            ))
+    if filtros.get('menor_idade'):
+        query = query.filter(Inscricao.id.in_(
+            select(CampoIndexado.inscricao_id)
+            .where(CampoIndexado.campo == 'data_nascimento', CampoIndexado.valor_data > data_limite_menor_idade())
+        ))
+    return query
+
+def obter_estatisticas(programa_id: int = None) -> tuple:
+    """Retorna (estatísticas do programa filtrado, estatísticas gerais).
+
+    Lê apenas a tabela de contadores, que tem no máximo uma linha por
+    programa e status. Sem programa filtrado, os dois dicionários são iguais.
+    """
+    def vazio():
+        stats = {chave: 0 for chave in CHAVES_ESTATISTICAS.values()}
+        stats['total'] = 0
+        return stats
+
+    geral = vazio()
+    do_programa = vazio()
+    for contador in ContadorStatus.query.all():
+        chave = CHAVES_ESTATISTICAS.get(contador.status)
+        alvos = [geral]
+        if contador.programa_id == programa_id:
+            alvos.append(do_programa)
+        for stats in alvos:
+            if chave:
+                stats[chave] += contador.total
+            stats['total'] += contador.total
+
+    if programa_id is None:
+        return geral, geral
+    return do_programa, geral
+
+def codificar_cursor(inscricao: Inscricao) -> str:
+    return f'{inscricao.criado_em.isoformat()}_{inscricao.id}'
+
+def decodificar_cursor(cursor):
+    """Converte o parâmetro `apos` em (criado_em, id); None se inválido."""
+    if not cursor:
+        return None
+    try:
+        criado_em, inscricao_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(criado_em), int(inscricao_id)
+    except ValueError:
+        return None
+
+def consulta_painel(filtros):
+    """Consulta das inscrições listadas no painel, já com os filtros aplicados."""
+    # Os detalhes (campos_extras) são carregados sob demanda ao expandir o card
+    return filtrar_inscricoes(Inscricao.query, filtros).options(
+        joinedload(Inscricao.programa),
+        defer(Inscricao.campos_extras)
+    )
+
+def consulta_pagina(query, cursor, limite):
+    """Restringe a consulta às `limite` inscrições após o cursor (keyset em criado_em, id)."""
+    posicao = decodificar_cursor(cursor)
+    if posicao:
+        criado_em, inscricao_id = posicao
+        query = query.filter(or_(
+            Inscricao.criado_em < criado_em,
+            and_(Inscricao.criado_em == criado_em, Inscricao.id < inscricao_id)
+        ))
+    return query.order_by(Inscricao.criado_em.desc(), Inscricao.id.desc()).limit(limite)
+
+def iterar_na_ordem_do_painel(query, tamanho=500):
+    """Percorre a consulta em lotes na ordem do painel (mais recentes primeiro)."""
+    cursor = None
+    while True:
+        lote = consulta_pagina(query, cursor, tamanho).all()
+        if not lote:
+            return
+        yield from lote
+        cursor = codificar_cursor(lote[-1])
+
+def paginar_busca(query, texto, cursor, por_pagina):
+    """Paginação dos resultados de busca, ordenados por relevância.
+
+    Aqui o cursor é o deslocamento na lista ranqueada. A consulta recebida
+    não deve conter o filtro de busca.
+    """
+    if not (termos_busca(texto) and busca_textual_disponivel()):
+        return paginar_inscricoes(filtrar_busca(query, texto), cursor, por_pagina)
+
+    inicio = int(cursor) if cursor and cursor.isdigit() else 0
+    ranking = consulta_busca(texto)
+    itens = (
+        query
+        .join(ranking, ranking.c.inscricao_id == Inscricao.id)
+        .order_by(ranking.c.relevancia, Inscricao.id.desc())
+        .offset(inicio)
+        .limit(por_pagina + 1)
+        .all()
+    )
+    if len(itens) > por_pagina:
+        return itens[:por_pagina], str(inicio + por_pagina)
+    return itens, None
+
+def paginar_inscricoes(query, cursor, por_pagina):
+    """Paginação por cursor, da inscrição mais recente à mais antiga.
+
+    Retorna a página e o cursor da próxima página (None na última).
+    """
+    itens = consulta_pagina(query, cursor, por_pagina + 1).all()
+    if len(itens) > por_pagina:
+        itens = itens[:por_pagina]
+        return itens, codificar_cursor(itens[-1])
+    return itens, None
+
+def colunas_exportacao(slugs) -> list:
+    """Colunas de campos_extras dos programas informados, sem repetição."""
+    colunas = []
+    for slug in slugs:
+        for campo in REGISTRO_CAMPOS.get(slug, []):
+            if campo.nome not in colunas:
+                colunas.append(campo.nome)
+    return colunas
+
+def valor_exportacao(valor) -> str:
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'Sim' if valor else 'Não'
+    if isinstance(valor, list):
+        return ', '.join(str(v) for v in valor)
+    if isinstance(valor, float):
+        return str(valor).replace('.', ',')
+    return str(valor)
+
+# Início de célula que o Excel/LibreOffice interpretam como fórmula
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+def celula_csv(valor) -> str:
+    """Valor para o CSV exportado, com textos vindos do formulário neutralizados contra fórmulas."""
+    texto = valor_exportacao(valor)
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return texto
+    if texto.startswith(INICIO_FORMULA):
+        return "'" + texto
+    return texto
+
+# NOVIDADES DO PAINEL
+def ultimos_eventos() -> tuple:
+    """(maior id de inscrição, maior id do histórico de status): ponto de partida das novidades."""
+    return (
+        db.session.query(func.max(Inscricao.id)).scalar() or 0,
+        db.session.query(func.max(HistoricoStatus.id)).scalar() or 0
+    )
+
+def novidades_painel(filtros, apos_inscricao: int, apos_historico: int, limite: int) -> dict:
+    """Inscrições e mudanças de status gravadas depois dos ids informados.
+
+    As consultas percorrem só as linhas novas pela chave primária; os filtros
+    do painel são aplicados depois, apenas às inscrições novas. Retorna as
+    inscrições que casam com os filtros, as mudanças de status, os novos ids
+    de partida e se ficaram mudanças para trás (mais de `limite`).
+    """
+    novos_ids = db.session.scalars(
+        select(Inscricao.id).where(Inscricao.id > apos_inscricao).order_by(Inscricao.id).limit(limite)
+    ).all()
+    inscricoes = []
+    if novos_ids:
+        inscricoes = consulta_painel(filtros).filter(Inscricao.id.in_(novos_ids)).order_by(Inscricao.id).all()
+
+    mudancas = (
+        HistoricoStatus.query
+        .filter(HistoricoStatus.id > apos_historico)
+        .order_by(HistoricoStatus.id)
+        .limit(limite + 1)
+        .all()
+    )
+    truncado = len(mudancas) > limite
+    if truncado:
+        # Alteração em lote grande: mais simples recarregar a página
+        mudancas = []
+        apos_historico = db.session.query(func.max(HistoricoStatus.id)).scalar()
+    elif mudancas:
+        apos_historico = mudancas[-1].id
+
+    return {
+        'inscricoes': inscricoes,
+        'mudancas': mudancas,
+        'apos_inscricao': novos_ids[-1] if novos_ids else apos_inscricao,
+        'apos_historico': apos_historico,
+        'truncado': truncado
+    }
+
+# STATUS EM LOTE
+def atualizar_status_em_lote(condicao, nova: str, admin_email: str = None, notificar: bool = False) -> int:
+    """Muda para `nova` o status das inscrições que atendem `condicao`.
+
+    Tudo acontece em uma única transação e com comandos sobre o conjunto
+    inteiro: um INSERT ... SELECT para a auditoria, um GROUP BY para ajustar
+    os contadores e um único UPDATE. Inscrições que já estão no status
+    pedido são ignoradas. Retorna quantas foram alteradas.
+    """
+    alvo = and_(condicao, Inscricao.status != nova)
+    return executar_com_retentativa(lambda: _atualizar_status(alvo, nova, admin_email, notificar))
+
+def _atualizar_status(alvo, nova, admin_email, notificar) -> int:
+    agora = datetime.utcnow()
+
+    # A auditoria vem primeiro: no SQLite, a primeira escrita trava o banco
+    # e garante que as leituras abaixo vejam o mesmo conjunto do UPDATE.
+    db.session.execute(
+        insert(HistoricoStatus).from_select(
+            ['inscricao_id', 'status_anterior', 'status_novo', 'admin_email', 'criado_em'],
+            select(Inscricao.id, Inscricao.status, literal(nova), literal(admin_email), literal(agora))
+            .where(alvo)
+        )
+    )
+    grupos = (
+        db.session.query(Inscricao.programa_id, Inscricao.status, func.count(Inscricao.id))
+        .filter(alvo)
+        .group_by(Inscricao.programa_id, Inscricao.status)
+        .all()
+    )
+    if not grupos:
+        return 0
+
+    if notificar and nova in MENSAGENS_STATUS:
+        destinatarios = (
+            db.session.query(
+                Inscricao.id, Inscricao.nome, Inscricao.email, Inscricao.telefone,
+                Inscricao.estado, Inscricao.campos_extras, Programa.nome
+            )
+            .join(Programa, Programa.id == Inscricao.programa_id)
+            .filter(alvo)
+            .all()
+        )
+        mensagens = modelo_status(nova).renderizar_lote(
+            contexto_email(nome, email, programa, nova, extras, telefone=telefone, estado=estado)
+            for _, nome, email, telefone, estado, extras, programa in destinatarios
+        )
+        db.session.execute(insert(EmailFila), [
+            dict(
+                mensagem,
+                inscricao_id=destinatario.id,
+                destinatario=destinatario.email,
+                status='pendente',
+                tentativas=0,
+                proxima_tentativa_em=agora,
+                criado_em=agora
+            )
+            for destinatario, mensagem in zip(destinatarios, mensagens)
+        ])
+
+    total = db.session.execute(
+        update(Inscricao)
+        .where(alvo)
+        .values(status=nova, atualizado_em=agora)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    for programa_id, status, quantidade in grupos:
+        ajustar_contador(programa_id, status, -quantidade)
+        ajustar_contador(programa_id, nova, quantidade)
+    return total
@@ -0,0 +1,250 @@
+import os
+import re
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from functools import partial
+
+from flask import current_app
+from jinja2.sandbox import SandboxedEnvironment
+
+from .banco import executar_com_retentativa
+from .cache import versao_conteudo
+from .modelos import db, STATUS_ROTULOS, ConfiguracaoEmail, EmailFila, Inscricao, Programa
+from .profiling import medir
+
+# Emails enviados quando o status muda (opcional na atualização em lote).
+# Modelos Jinja, com as mesmas variáveis do email de confirmação.
+MENSAGENS_STATUS = {
+    'pre_selecionada': (
+        'Você foi pré-selecionada - {{ programa }}',
+        'Olá {{ nome }},\n\nSua inscrição para o programa {{ programa }} foi pré-selecionada. '
+        'Em breve entraremos em contato com os próximos passos.\n\nEquipe FIA Girls on Track'
+    ),
+    'selecionada': (
+        'Parabéns! Você foi selecionada - {{ programa }}',
+        'Olá {{ nome }},\n\nTemos o prazer de informar que você foi selecionada para o programa '
+        '{{ programa }}.\n\nEquipe FIA Girls on Track'
+    ),
+    'nao_selecionada': (
+        'Resultado da seleção - {{ programa }}',
+        'Olá {{ nome }},\n\nAgradecemos sua inscrição no programa {{ programa }}. Desta vez você não '
+        'foi selecionada, mas esperamos vê-la nas próximas edições.\n\nEquipe FIA Girls on Track'
+    )
+}
+
+# MODELOS DE EMAIL
+# Assunto, corpo e HTML são modelos Jinja executados em sandbox (o conteúdo
+# vem do painel). Cada modelo é compilado uma vez e reaproveitado; o da
+# confirmação é recarregado quando a versão do conteúdo muda, o que
+# `admin.config` faz ao salvar (em todos os workers).
+_ambiente_texto = SandboxedEnvironment(autoescape=False, keep_trailing_newline=True)
+_ambiente_html = SandboxedEnvironment(autoescape=True, keep_trailing_newline=True)
+_modelos_email = {}
+
+def converter_placeholders(modelo: str) -> str:
+    """Converte o formato antigo ({nome}) para Jinja ({{ nome }})."""
+    return re.sub(r'(?<!\{)\{(\w+)\}(?!\})', r'{{ \1 }}', modelo)
+
+class ModeloEmail:
+    """Assunto, corpo em texto e (opcional) corpo HTML já compilados."""
+
+    def __init__(self, assunto: str, corpo: str, html: str = None):
+        self.assunto = _ambiente_texto.from_string(converter_placeholders(assunto))
+        self.corpo = _ambiente_texto.from_string(converter_placeholders(corpo))
+        self.html = _ambiente_html.from_string(converter_placeholders(html)) if html else None
+
+    def renderizar(self, contexto: dict) -> dict:
+        return {
+            'assunto': ' '.join(self.assunto.render(contexto).split()),
+            'corpo': self.corpo.render(contexto),
+            'corpo_html': self.html.render(contexto) if self.html else None
+        }
+
+    def renderizar_lote(self, contextos) -> list:
+        return [self.renderizar(contexto) for contexto in contextos]
+
+def contexto_email(nome, email, programa, status, campos_extras=None, **outros) -> dict:
+    """Variáveis disponíveis nos modelos de email."""
+    return dict(
+        outros,
+        nome=nome,
+        primeiro_nome=(nome or '').split(' ')[0],
+        email=email,
+        programa=programa,
+        status=status,
+        status_rotulo=STATUS_ROTULOS.get(status, status),
+        campos_extras=campos_extras or {}
+    )
+
+def validar_modelo_email(assunto: str, corpo: str, html: str = None):
+    """Compila e renderiza com dados de exemplo; levanta TemplateError se inválido."""
+    ModeloEmail(assunto, corpo, html).renderizar(contexto_email(
+        'Maria Silva', 'maria@exemplo.com', 'Programa', 'pendente', {}, telefone='', estado='SP'
+    ))
+
+def modelo_confirmacao() -> ModeloEmail:
+    versao, _ = versao_conteudo()
+    em_cache = _modelos_email.get('confirmacao')
+    if em_cache is None or em_cache[0] != versao:
+        config = obter_configuracao_email()
+        em_cache = (versao, ModeloEmail(config.template_assunto, config.template_corpo, config.template_html))
+        _modelos_email['confirmacao'] = em_cache
+    return em_cache[1]
+
+def modelo_status(status: str) -> ModeloEmail:
+    if status not in _modelos_email:
+        _modelos_email[status] = ModeloEmail(*MENSAGENS_STATUS[status])
+    return _modelos_email[status]
+
+def obter_configuracao_email() -> ConfiguracaoEmail:
+    config = ConfiguracaoEmail.query.first()
+    if not config:
+        config = ConfiguracaoEmail()
+        db.session.add(config)
+        db.session.commit()
+    return config
+
+def enfileirar_email_confirmacao(inscricao: Inscricao, programa: Programa) -> EmailFila:
+    """Renderiza o email de confirmação e o coloca na fila de envio.
+
+    Nada é enviado aqui: o item é gravado junto com a inscrição e entregue
+    depois pelo comando `flask processar-emails`.
+    """
+    mensagem = modelo_confirmacao().renderizar(contexto_email(
+        inscricao.nome, inscricao.email, programa.nome, inscricao.status or 'pendente', inscricao.campos_extras,
+        telefone=inscricao.telefone, estado=inscricao.estado
+    ))
+    item = EmailFila(
+        inscricao=inscricao,
+        destinatario=inscricao.email,
+        status='pendente',
+        **mensagem
+    )
+    db.session.add(item)
+    return item
+
+class ConexaoSMTP:
+    """Conexão SMTP autenticada, reaproveitada entre vários envios.
+
+    A conexão é aberta no primeiro envio e refeita automaticamente se o
+    servidor a derrubar (timeout de inatividade, por exemplo). O smtplib só
+    é importado por quem envia (o `flask processar-emails`), não pelos workers.
+    """
+
+    def __init__(self, host, porta, usuario, senha, remetente, timeout=30):
+        self.host = host
+        self.porta = int(porta)
+        self.usuario = usuario
+        self.senha = senha
+        self.remetente = remetente or usuario
+        self.timeout = timeout
+        self._servidor = None
+
+    @classmethod
+    def do_ambiente(cls):
+        """Cria a conexão a partir das variáveis SMTP_*; None se não configurado."""
+        host = os.environ.get('SMTP_HOST')
+        usuario = os.environ.get('SMTP_USER')
+        senha = os.environ.get('SMTP_PASS')
+        if not (host and usuario and senha):
+            return None
+        return cls(
+            host,
+            os.environ.get('SMTP_PORT', '587'),
+            usuario,
+            senha,
+            os.environ.get('SMTP_FROM', usuario)
+        )
+
+    def _conectar(self):
+        import smtplib
+        with medir('smtp_conexao'):
+            servidor = smtplib.SMTP(self.host, self.porta, timeout=self.timeout)
+            servidor.starttls()
+            servidor.login(self.usuario, self.senha)
+        self._servidor = servidor
+
+    def enviar(self, msg: EmailMessage):
+        import smtplib
+        if msg['From'] is None:
+            msg['From'] = self.remetente
+        if self._servidor is None:
+            self._conectar()
+        with medir('smtp_envio'):
+            try:
+                self._servidor.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Conexão caiu enquanto estava ociosa: reconecta uma vez
+                self._servidor = None
+                self._conectar()
+                self._servidor.send_message(msg)
+
+    def fechar(self):
+        import smtplib
+        if self._servidor is not None:
+            try:
+                self._servidor.quit()
+            except smtplib.SMTPException:
+                pass
+            self._servidor = None
+
+def montar_mensagem(item: EmailFila) -> EmailMessage:
+    msg = EmailMessage()
+    msg['Subject'] = item.assunto
+    msg['To'] = item.destinatario
+    msg.set_content(item.corpo)
+    if item.corpo_html:
+        msg.add_alternative(item.corpo_html, subtype='html')
+    return msg
+
+def registrar_falha_email(item: EmailFila, erro: Exception, definitiva=False):
+    """Agenda nova tentativa com backoff exponencial ou marca como falhou."""
+    item.tentativas += 1
+    item.ultimo_erro = f'{type(erro).__name__}: {erro}'
+    if definitiva or item.tentativas >= current_app.config['EMAIL_MAX_TENTATIVAS']:
+        item.status = 'falhou'
+        return
+    atraso = current_app.config['EMAIL_BACKOFF_SEGUNDOS'] * 2 ** (item.tentativas - 1)
+    item.proxima_tentativa_em = datetime.utcnow() + timedelta(seconds=min(atraso, 6 * 3600))
+
+def marcar_email_enviado(item: EmailFila):
+    item.status = 'enviado'
+    item.enviado_em = datetime.utcnow()
+    item.tentativas += 1
+    item.ultimo_erro = None
+
+def processar_fila_emails(conexao: ConexaoSMTP, lote: int = None) -> dict:
+    """Envia um lote de emails pendentes usando uma única conexão SMTP.
+
+    Retorna a contagem de enviados e de falhas. Se a conexão com o servidor
+    falhar, o lote é interrompido e os itens restantes ficam para a próxima
+    execução sem consumir tentativas.
+    """
+    import smtplib
+    lote = lote or current_app.config['EMAIL_LOTE']
+    itens = (
+        EmailFila.query
+        .filter(EmailFila.status == 'pendente', EmailFila.proxima_tentativa_em <= datetime.utcnow())
+        .order_by(EmailFila.proxima_tentativa_em, EmailFila.id)
+        .limit(lote)
+        .all()
+    )
+
+    # Cada item é gravado logo depois do envio: se o processo cair no meio do
+    # lote, o que o servidor já aceitou não volta como pendente
+    resultado = {'enviados': 0, 'falhas': 0}
+    for item in itens:
+        try:
+            conexao.enviar(montar_mensagem(item))
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+            executar_com_retentativa(partial(registrar_falha_email, item, e, definitiva=True))
+            resultado['falhas'] += 1
+        except (smtplib.SMTPException, OSError) as e:
+            executar_com_retentativa(partial(registrar_falha_email, item, e))
+            resultado['falhas'] += 1
+            conexao.fechar()
+            break
+        else:
+            executar_com_retentativa(partial(marcar_email_enviado, item))
+            resultado['enviados'] += 1
+    return resultado
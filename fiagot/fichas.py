@@ -0,0 +1,240 @@
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+from .banco import iterar_em_lotes
+from .config import FICHAS_FOLDER, LOTES_FOLDER
+from .consultas import filtrar_inscricoes, valor_exportacao
+from .modelos import db, STATUS_ROTULOS, Inscricao, Programa
+from .uploads import caminho_derivado
+
+LOTES_VALIDADE_HORAS = 24
+
+# FICHAS EM PDF
+def dados_ficha(inscricao: Inscricao, programa: Programa) -> dict:
+    """Dados da ficha em um dicionário simples, que pode ir para outro processo."""
+    foto = None
+    if inscricao.foto_filename:
+        # Prefere a versão média em webp, bem mais leve que o original
+        for caminho in (
+            caminho_derivado(inscricao.foto_filename, 'media'),
+            os.path.join(current_app.config['UPLOAD_FOLDER'], inscricao.foto_filename)
+        ):
+            if os.path.exists(caminho):
+                foto = caminho
+                break
+    campos = [
+        (campo.replace('_', ' ').title(), valor_exportacao(valor))
+        for campo, valor in (inscricao.campos_extras or {}).items()
+        if valor not in (None, '', [])
+    ]
+    return {
+        'id': inscricao.id,
+        'nome': inscricao.nome,
+        'email': inscricao.email,
+        'telefone': inscricao.telefone,
+        'estado': inscricao.estado,
+        'status': STATUS_ROTULOS.get(inscricao.status, inscricao.status),
+        'programa': programa.nome,
+        'criado_em': inscricao.criado_em.strftime('%d/%m/%Y %H:%M') if inscricao.criado_em else '',
+        'campos': campos,
+        'foto': foto
+    }
+
+def caminho_ficha(inscricao: Inscricao) -> str:
+    """Arquivo da ficha em cache; muda sempre que a inscrição é atualizada."""
+    versao = (inscricao.atualizado_em or inscricao.criado_em or datetime.min).strftime('%Y%m%d%H%M%S%f')
+    return os.path.join(FICHAS_FOLDER, f'{inscricao.id}_{versao}.pdf')
+
+def renderizar_ficha_pdf(dados: dict, destino: str) -> str:
+    """Desenha a ficha em `destino`. Roda nos processos do lote, sem app context."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import ImageReader, simpleSplit
+    from reportlab.pdfgen import canvas
+
+    largura, altura = A4
+    margem = 50
+    temporario = f'{destino}.{os.getpid()}.tmp'
+    pdf = canvas.Canvas(temporario, pagesize=A4)
+    pdf.setTitle(f"Ficha {dados['id']} - {dados['nome']}")
+
+    y = altura - margem
+    pdf.setFont('Helvetica-Bold', 16)
+    pdf.drawString(margem, y, 'FIA Girls on Track Brasil')
+    y -= 20
+    pdf.setFont('Helvetica', 11)
+    pdf.drawString(margem, y, dados['programa'])
+
+    if dados['foto']:
+        try:
+            pdf.drawImage(
+                ImageReader(dados['foto']),
+                largura - margem - 110, altura - margem - 130, 110, 130,
+                preserveAspectRatio=True, anchor='ne'
+            )
+        except Exception:
+            pass  # foto corrompida não impede a ficha
+
+    y -= 40
+    basicos = [
+        ('Inscrição', f"#{dados['id']} em {dados['criado_em']}"),
+        ('Nome', dados['nome']),
+        ('E-mail', dados['email']),
+        ('Telefone', dados['telefone']),
+        ('Estado', dados['estado']),
+        ('Status', dados['status']),
+    ]
+    for rotulo, valor in basicos + [('', '')] + dados['campos']:
+        if not rotulo:
+            y -= 10
+            continue
+        linhas = simpleSplit(valor, 'Helvetica', 10, largura - 2 * margem - 140)
+        if y - 14 * max(len(linhas), 1) < margem:
+            pdf.showPage()
+            y = altura - margem
+        pdf.setFont('Helvetica-Bold', 10)
+        pdf.drawString(margem, y, rotulo)
+        pdf.setFont('Helvetica', 10)
+        for linha in linhas or ['']:
+            pdf.drawString(margem + 140, y, linha)
+            y -= 14
+        y -= 4
+
+    pdf.save()
+    os.replace(temporario, destino)
+    return destino
+
+def obter_ficha(inscricao: Inscricao) -> str:
+    """Caminho da ficha em PDF, gerando-a se não houver versão atual em cache."""
+    destino = caminho_ficha(inscricao)
+    if not os.path.exists(destino):
+        os.makedirs(FICHAS_FOLDER, exist_ok=True)
+        renderizar_ficha_pdf(dados_ficha(inscricao, inscricao.programa), destino)
+        remover_fichas_antigas(inscricao.id, destino)
+    return destino
+
+def remover_fichas_antigas(inscricao_id: int, atual: str):
+    """Apaga as versões da ficha anteriores a `atual`.
+
+    Outra requisição (ou um lote) pode estar gerando ou lendo uma versão
+    igual ou mais nova ao mesmo tempo: essas ficam, e um arquivo que já
+    sumiu não é erro.
+    """
+    versao_atual = int(os.path.basename(atual)[:-len('.pdf')].split('_', 1)[1])
+    for antiga in glob.glob(os.path.join(FICHAS_FOLDER, f'{inscricao_id}_*.pdf')):
+        versao = os.path.basename(antiga)[:-len('.pdf')].split('_', 1)[1]
+        if versao.isdigit() and int(versao) < versao_atual:
+            try:
+                os.remove(antiga)
+            except FileNotFoundError:
+                pass
+
+def remover_fichas(ids) -> int:
+    """Apaga as fichas em cache e os ZIPs de lote que incluem alguma das inscrições.
+
+    Usada no arquivamento e no expurgo (LGPD): as fichas trazem nome, contato
+    e foto. Retorna quantos arquivos foram apagados.
+    """
+    import zipfile
+
+    ids = {int(i) for i in ids}
+    if not ids:
+        return 0
+    apagados = 0
+    for inscricao_id in ids:
+        for ficha in glob.glob(os.path.join(FICHAS_FOLDER, f'{inscricao_id}_*.pdf')):
+            os.remove(ficha)
+            apagados += 1
+    # Os PDFs do ZIP se chamam <id>_<nome>.pdf (ver gerar_lote_fichas)
+    for caminho in glob.glob(os.path.join(LOTES_FOLDER, '*.zip')):
+        try:
+            with zipfile.ZipFile(caminho) as arquivo_zip:
+                incluidos = {nome.split('_', 1)[0] for nome in arquivo_zip.namelist()}
+        except (OSError, zipfile.BadZipFile):
+            continue
+        if any(str(inscricao_id) in incluidos for inscricao_id in ids):
+            os.remove(caminho)
+            apagados += 1
+    return apagados
+
+def caminho_lote(lote_id: str, extensao: str) -> str:
+    return os.path.join(LOTES_FOLDER, f'{lote_id}.{extensao}')
+
+def ler_progresso_lote(lote_id: str):
+    try:
+        with open(caminho_lote(lote_id, 'json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def gravar_progresso_lote(lote_id: str, progresso: dict):
+    # Gravado em arquivo para que qualquer worker do gunicorn consiga consultar
+    temporario = caminho_lote(lote_id, 'json.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(progresso, f)
+    os.replace(temporario, caminho_lote(lote_id, 'json'))
+
+def limpar_lotes_antigos():
+    limite = time.time() - LOTES_VALIDADE_HORAS * 3600
+    for caminho in glob.glob(os.path.join(LOTES_FOLDER, '*')):
+        if os.path.getmtime(caminho) < limite:
+            os.remove(caminho)
+
+def gerar_lote_fichas(app, lote_id: str, filtros: dict):
+    """Gera as fichas das inscrições filtradas e as empacota em um ZIP.
+
+    Roda em uma thread; os PDFs que não estão em cache são desenhados em um
+    ProcessPoolExecutor e o ZIP é montado em um arquivo temporário.
+    """
+    import multiprocessing
+    import zipfile
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    progresso = {'status': 'processando', 'total': 0, 'concluidas': 0, 'erro': None}
+    with app.app_context():
+        try:
+            programas = {p.id: p for p in Programa.query.all()}
+            query = filtrar_inscricoes(Inscricao.query, filtros)
+            progresso['total'] = query.count()
+            gravar_progresso_lote(lote_id, progresso)
+
+            # Percorre em lotes guardando só caminhos e os dados das fichas a gerar
+            os.makedirs(FICHAS_FOLDER, exist_ok=True)
+            arquivos = []
+            pendentes = []
+            for inscricao in iterar_em_lotes(query):
+                destino = caminho_ficha(inscricao)
+                nome = f"{inscricao.id}_{secure_filename(inscricao.nome) or 'inscricao'}.pdf"
+                arquivos.append((destino, nome))
+                if os.path.exists(destino):
+                    progresso['concluidas'] += 1
+                else:
+                    pendentes.append((dados_ficha(inscricao, programas[inscricao.programa_id]), destino))
+            db.session.remove()
+
+            if pendentes:
+                contexto = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(app.config['FICHAS_PROCESSOS'], mp_context=contexto) as pool:
+                    futuros = [pool.submit(renderizar_ficha_pdf, dados, destino) for dados, destino in pendentes]
+                    for futuro in as_completed(futuros):
+                        futuro.result()
+                        progresso['concluidas'] += 1
+                        if progresso['concluidas'] % 20 == 0:
+                            gravar_progresso_lote(lote_id, progresso)
+
+            temporario = caminho_lote(lote_id, 'zip.tmp')
+            # PDFs já são comprimidos: ZIP_STORED evita gastar CPU à toa
+            with zipfile.ZipFile(temporario, 'w', zipfile.ZIP_STORED) as arquivo_zip:
+                for destino, nome in arquivos:
+                    arquivo_zip.write(destino, nome)
+            os.replace(temporario, caminho_lote(lote_id, 'zip'))
+            progresso['status'] = 'concluido'
+        except Exception as e:
+            progresso['status'] = 'erro'
+            progresso['erro'] = str(e)
+        gravar_progresso_lote(lote_id, progresso)
@@ -0,0 +1,242 @@
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+
+from .config import LIMITES_BANCO
+
+# LIMITE DE REQUISIÇÕES
+# Token bucket por IP e por regra (inscrição, login do admin), aplicado como
+# middleware WSGI: a requisição recusada recebe 429 antes de o Flask ler o
+# corpo multipart ou calcular o hash da senha. Os baldes ficam em um SQLite
+# próprio (cache/limites.db) ou no Redis, para valer entre os workers do
+# gunicorn; 'memoria' serve para um único processo.
+REGRAS_LIMITE = [
+    ('inscricao', 'POST', re.compile(r'^/inscricao/[^/]+/?$'), 'LIMITE_INSCRICAO'),
+    ('login', 'POST', re.compile(r'^/admin/login/?$'), 'LIMITE_LOGIN'),
+]
+
+def ler_limite(texto: str) -> tuple:
+    """'10/600' -> (capacidade 10, reposição de 10 fichas a cada 600 segundos)."""
+    quantidade, segundos = texto.split('/')
+    return int(quantidade), float(segundos)
+
+def consumir_ficha(tokens, atualizado_em, capacidade, periodo, agora) -> tuple:
+    """Aplica o token bucket; retorna (permitido, fichas restantes, segundos para a próxima)."""
+    taxa = capacidade / periodo
+    if tokens is None:
+        tokens = capacidade
+    else:
+        tokens = min(capacidade, tokens + (agora - atualizado_em) * taxa)
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / taxa
+
+class BaldesMemoria:
+    """Baldes no próprio processo (desenvolvimento ou um único worker)."""
+
+    def __init__(self):
+        self._baldes = {}
+        self._rejeicoes = {}
+        self._trava = threading.Lock()
+
+    def consumir(self, chave, capacidade, periodo) -> tuple:
+        agora = time.time()
+        with self._trava:
+            tokens, atualizado_em = self._baldes.get(chave, (None, agora))
+            permitido, tokens, espera = consumir_ficha(tokens, atualizado_em, capacidade, periodo, agora)
+            self._baldes[chave] = (tokens, agora)
+        return permitido, espera
+
+    def registrar_rejeicao(self, regra):
+        with self._trava:
+            self._rejeicoes[regra] = self._rejeicoes.get(regra, 0) + 1
+
+    def rejeicoes(self) -> dict:
+        return dict(self._rejeicoes)
+
+    def limpar(self):
+        with self._trava:
+            self._baldes.clear()
+            self._rejeicoes.clear()
+
+class BaldesSQLite:
+    """Baldes em um arquivo SQLite separado, compartilhado entre processos.
+
+    Cada consulta é uma transação curta com BEGIN IMMEDIATE, então dois
+    workers não consomem a mesma ficha. Usa sqlite3 direto, fora do pool do
+    SQLAlchemy, e uma conexão por thread.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+
+    def _conexao(self):
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=2, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS baldes (chave TEXT PRIMARY KEY, tokens REAL, atualizado_em REAL)'
+            )
+            conexao.execute('CREATE TABLE IF NOT EXISTS rejeicoes (regra TEXT PRIMARY KEY, total INTEGER)')
+            self._local.conexao = conexao
+        return conexao
+
+    def consumir(self, chave, capacidade, periodo) -> tuple:
+        conexao = self._conexao()
+        agora = time.time()
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            linha = conexao.execute('SELECT tokens, atualizado_em FROM baldes WHERE chave = ?', (chave,)).fetchone()
+            tokens, atualizado_em = linha if linha else (None, agora)
+            permitido, tokens, espera = consumir_ficha(tokens, atualizado_em, capacidade, periodo, agora)
+            conexao.execute('INSERT OR REPLACE INTO baldes VALUES (?, ?, ?)', (chave, tokens, agora))
+            if random.random() < 0.01:
+                # Baldes parados há um dia já estão cheios: podem sumir
+                conexao.execute('DELETE FROM baldes WHERE atualizado_em < ?', (agora - 86400,))
+            conexao.execute('COMMIT')
+        except BaseException:
+            conexao.execute('ROLLBACK')
+            raise
+        return permitido, espera
+
+    def registrar_rejeicao(self, regra):
+        self._conexao().execute(
+            'INSERT INTO rejeicoes VALUES (?, 1) ON CONFLICT (regra) DO UPDATE SET total = total + 1', (regra,)
+        )
+
+    def rejeicoes(self) -> dict:
+        return dict(self._conexao().execute('SELECT regra, total FROM rejeicoes').fetchall())
+
+    def limpar(self):
+        conexao = self._conexao()
+        conexao.execute('DELETE FROM baldes')
+        conexao.execute('DELETE FROM rejeicoes')
+
+class BaldesRedis:
+    """Baldes no Redis (ou compatível), atualizados por um script Lua atômico.
+
+    Requer o pacote `redis`, que não faz parte do requirements.txt.
+    """
+
+    SCRIPT = """
+    local capacidade = tonumber(ARGV[1])
+    local taxa = tonumber(ARGV[2])
+    local agora = tonumber(ARGV[3])
+    local balde = redis.call('HMGET', KEYS[1], 'tokens', 'atualizado_em')
+    local tokens = tonumber(balde[1])
+    if tokens == nil then
+        tokens = capacidade
+    else
+        tokens = math.min(capacidade, tokens + (agora - tonumber(balde[2])) * taxa)
+    end
+    local permitido = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        permitido = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'atualizado_em', tostring(agora))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacidade / taxa) + 1)
+    return {permitido, tostring(tokens)}
+    """
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    def consumir(self, chave, capacidade, periodo) -> tuple:
+        taxa = capacidade / periodo
+        permitido, tokens = self._script(keys=[f'limites:{chave}'], args=[capacidade, taxa, time.time()])
+        return bool(permitido), 0 if permitido else (1 - float(tokens)) / taxa
+
+    def registrar_rejeicao(self, regra):
+        self._redis.hincrby('limites:rejeicoes', regra, 1)
+
+    def rejeicoes(self) -> dict:
+        return {regra.decode(): int(total) for regra, total in self._redis.hgetall('limites:rejeicoes').items()}
+
+    def limpar(self):
+        for chave in self._redis.scan_iter('limites:*'):
+            self._redis.delete(chave)
+
+_baldes = None
+
+def obter_baldes(config=None):
+    """Backend dos limites, criado no primeiro uso (depois do fork do gunicorn)."""
+    global _baldes
+    if _baldes is None:
+        backend = (config or current_app.config)['LIMITE_BACKEND']
+        if backend == 'memoria':
+            _baldes = BaldesMemoria()
+        elif backend.startswith(('redis://', 'rediss://', 'unix://')):
+            _baldes = BaldesRedis(backend)
+        else:
+            _baldes = BaldesSQLite(LIMITES_BANCO)
+    return _baldes
+
+def ip_cliente(environ, proxies: int = 0) -> str:
+    """IP do cliente, considerando `proxies` proxies confiáveis na frente."""
+    encaminhado = [ip.strip() for ip in environ.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if proxies and len(encaminhado) >= proxies:
+        return encaminhado[-proxies]
+    return environ.get('REMOTE_ADDR', '')
+
+class LimitadorRequisicoes:
+    """Middleware WSGI que aplica REGRAS_LIMITE antes de a requisição chegar ao Flask."""
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        if app.config['LIMITES_ATIVOS'] and not app.config['LIMITE_PROXIES_CONFIAVEIS']:
+            app.logger.warning(
+                'Limite de requisições ativo com LIMITE_PROXIES_CONFIAVEIS=0: atrás de um proxy '
+                'reverso todas as requisições contam para o IP do proxy.'
+            )
+
+    def __call__(self, environ, start_response):
+        if self.app.config['LIMITES_ATIVOS']:
+            metodo = environ.get('REQUEST_METHOD')
+            caminho = environ.get('PATH_INFO', '')
+            for regra, metodo_regra, padrao, config in REGRAS_LIMITE:
+                if metodo == metodo_regra and padrao.match(caminho):
+                    ip = ip_cliente(environ, self.app.config['LIMITE_PROXIES_CONFIAVEIS'])
+                    espera = self.verificar(regra, ip, config)
+                    if espera is not None:
+                        return self.recusar(espera, start_response)
+                    break
+        return self.wsgi_app(environ, start_response)
+
+    def verificar(self, regra, ip, config):
+        """Segundos até a próxima ficha se a requisição deve ser recusada; None se liberada."""
+        capacidade, periodo = ler_limite(self.app.config[config])
+        baldes = obter_baldes(self.app.config)
+        try:
+            permitido, espera = baldes.consumir(f'{regra}:{ip}', capacidade, periodo)
+            if not permitido:
+                baldes.registrar_rejeicao(regra)
+        except Exception as e:
+            # Falha no backend não pode derrubar as inscrições: libera
+            self.app.logger.error('Limite de requisições indisponível: %s', e)
+            return None
+        return None if permitido else espera
+
+    def recusar(self, espera, start_response):
+        corpo = (
+            '<!doctype html><meta charset="utf-8"><title>Muitas tentativas</title>'
+            '<p>Muitas tentativas em pouco tempo. Aguarde alguns minutos e tente novamente.</p>'
+        ).encode('utf-8')
+        start_response('429 Too Many Requests', [
+            ('Content-Type', 'text/html; charset=utf-8'),
+            ('Content-Length', str(len(corpo))),
+            ('Retry-After', str(max(int(espera) + 1, 1)))
+        ])
+        return [corpo]
@@ -0,0 +1,79 @@
+from sqlalchemy import inspect, text
+
+from .banco import criar_busca_textual, recalcular_contadores
+from .campos import converter_campos_existentes, popular_campos_indexados, popular_chaves_unicas
+from .modelos import db, Inscricao, VersaoSchema
+
+# MIGRAÇÕES
+# Cada migração é (versão, descrição, passos). Um passo é um comando SQL ou
+# uma função sem argumentos. Nunca altere uma migração já publicada: acrescente
+# uma nova ao final da lista e espelhe a mudança em fiagot/modelos.py.
+def adicionar_coluna(tabela: str, coluna: str, tipo: str):
+    """Passo de migração que adiciona a coluna, se a tabela ainda não a tiver.
+
+    Tabelas criadas pelo `create_all` na mesma execução já vêm completas.
+    """
+    def passo():
+        colunas = {c['name'] for c in inspect(db.session.connection()).get_columns(tabela)}
+        if coluna not in colunas:
+            db.session.execute(text(f'ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}'))
+    return passo
+
+MIGRACOES = [
+    (1, 'Índices das consultas do painel, avisos e fila de emails', [
+        'CREATE INDEX IF NOT EXISTS ix_inscricoes_criado_em_id ON inscricoes (criado_em, id)',
+        'CREATE INDEX IF NOT EXISTS ix_inscricoes_programa_criado_em ON inscricoes (programa_id, criado_em, id)',
+        'CREATE INDEX IF NOT EXISTS ix_inscricoes_status_criado_em ON inscricoes (status, criado_em, id)',
+        'CREATE INDEX IF NOT EXISTS ix_inscricoes_estado_criado_em ON inscricoes (estado, criado_em, id)',
+        'CREATE INDEX IF NOT EXISTS ix_avisos_programa_ativo ON avisos (programa_id, ativo)',
+        'CREATE INDEX IF NOT EXISTS ix_email_fila_status_proxima ON email_fila (status, proxima_tentativa_em)',
+    ]),
+    (2, 'Busca textual (FTS5) em nome, email e campos extras', [
+        criar_busca_textual,
+    ]),
+    (3, 'Campos extras indexados (campos_indexados)', [
+        popular_campos_indexados,
+    ]),
+    (4, 'Token de envio e chave única por programa (inscrições duplicadas)', [
+        adicionar_coluna('inscricoes', 'token_envio', 'VARCHAR(64)'),
+        adicionar_coluna('inscricoes', 'chave_unica', 'VARCHAR(255)'),
+        popular_chaves_unicas,
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_inscricoes_token_envio ON inscricoes (token_envio)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_inscricoes_programa_chave ON inscricoes (programa_id, chave_unica)',
+    ]),
+    (5, 'Versão HTML dos emails', [
+        adicionar_coluna('configuracao_email', 'template_html', 'TEXT'),
+        adicionar_coluna('email_fila', 'corpo_html', 'TEXT'),
+    ]),
+    (6, 'Peso, altura e idade em campos_extras gravados como números', [
+        converter_campos_existentes,
+    ]),
+    (7, 'Contadores de status por programa (contadores_status)', [
+        recalcular_contadores,
+    ]),
+]
+
+def aplicar_migracoes() -> list:
+    """Cria as tabelas que faltam e aplica, em ordem, as migrações pendentes.
+
+    Em um banco novo o `create_all` já gera o schema atual, então as
+    migrações são apenas registradas como aplicadas.
+    """
+    banco_novo = not inspect(db.engine).has_table(Inscricao.__tablename__)
+    db.create_all()
+
+    aplicadas = {versao for (versao,) in db.session.query(VersaoSchema.versao)}
+    novas = []
+    for versao, descricao, passos in MIGRACOES:
+        if versao in aplicadas:
+            continue
+        if not banco_novo:
+            for passo in passos:
+                if callable(passo):
+                    passo()
+                else:
+                    db.session.execute(text(passo))
+        db.session.add(VersaoSchema(versao=versao, descricao=descricao))
+        db.session.commit()
+        novas.append((versao, descricao))
+    return novas
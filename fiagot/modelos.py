@@ -0,0 +1,174 @@
+from datetime import datetime
+
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+STATUS_VALIDOS = ['pendente', 'selecionada', 'nao_selecionada', 'pre_selecionada']
+CHAVES_ESTATISTICAS = {
+    'pendente': 'pendentes',
+    'pre_selecionada': 'pre_selecionadas',
+    'selecionada': 'selecionadas',
+    'nao_selecionada': 'nao_selecionadas'
+}
+
+STATUS_ROTULOS = {
+    'pendente': 'Pendente',
+    'pre_selecionada': 'Pré-Selecionada',
+    'selecionada': 'Selecionada',
+    'nao_selecionada': 'Não Selecionada'
+}
+
+# MODELOS
+class AdminUser(db.Model):
+    __tablename__ = 'admin_user'
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Programa(db.Model):
+    __tablename__ = 'programas'
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(120), nullable=False)
+    slug = db.Column(db.String(120), unique=True, nullable=False)
+    descricao_curta = db.Column(db.String(250), nullable=True)
+    descricao = db.Column(db.Text, nullable=True)
+    data_abertura = db.Column(db.Date, nullable=True)
+    data_fechamento = db.Column(db.Date, nullable=True)
+    ativo = db.Column(db.Boolean, default=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    avisos = db.relationship('Aviso', backref='programa', lazy=True)
+    inscricoes = db.relationship('Inscricao', backref='programa', lazy=True)
+
+class Aviso(db.Model):
+    __tablename__ = 'avisos'
+    __table_args__ = (
+        db.Index('ix_avisos_programa_ativo', 'programa_id', 'ativo'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    programa_id = db.Column(db.Integer, db.ForeignKey('programas.id'), nullable=False)
+    titulo = db.Column(db.String(255), nullable=False)
+    descricao = db.Column(db.Text, nullable=False)
+    ativo = db.Column(db.Boolean, default=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Inscricao(db.Model):
+    __tablename__ = 'inscricoes'
+    # Índices no formato das consultas do painel: filtro + ordenação (criado_em, id)
+    __table_args__ = (
+        db.Index('ix_inscricoes_criado_em_id', 'criado_em', 'id'),
+        db.Index('ix_inscricoes_programa_criado_em', 'programa_id', 'criado_em', 'id'),
+        db.Index('ix_inscricoes_status_criado_em', 'status', 'criado_em', 'id'),
+        db.Index('ix_inscricoes_estado_criado_em', 'estado', 'criado_em', 'id'),
+        # Reenvios: o mesmo formulário (token) ou a mesma pessoa no programa (chave)
+        db.Index('ux_inscricoes_token_envio', 'token_envio', unique=True),
+        db.Index('ux_inscricoes_programa_chave', 'programa_id', 'chave_unica', unique=True),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Campos comuns
+    nome = db.Column(db.String(200), nullable=False)
+    email = db.Column(db.String(200), nullable=False)
+    telefone = db.Column(db.String(50), nullable=False)
+    estado = db.Column(db.String(2), nullable=False)
+    
+    # Campos específicos armazenados em JSON
+    campos_extras = db.Column(db.JSON, nullable=True)
+    
+    # Arquivos
+    foto_filename = db.Column(db.String(255), nullable=True)
+    curriculo_filename = db.Column(db.String(255), nullable=True)
+
+    # Detecção de envio duplicado
+    token_envio = db.Column(db.String(64), nullable=True)
+    chave_unica = db.Column(db.String(255), nullable=True)
+    
+    # Relacionamentos
+    programa_id = db.Column(db.Integer, db.ForeignKey('programas.id'), nullable=False)
+    status = db.Column(db.String(20), default='pendente', nullable=False)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ConfiguracaoEmail(db.Model):
+    __tablename__ = 'configuracao_email'
+    id = db.Column(db.Integer, primary_key=True)
+    template_assunto = db.Column(db.String(255), nullable=False, default='Recebemos sua inscrição')
+    template_corpo = db.Column(
+        db.Text,
+        nullable=False,
+        default='Olá {nome},\n\nRecebemos sua inscrição para o programa {programa}.\n\nObrigada!\nEquipe FIA Girls on Track'
+    )
+    template_html = db.Column(db.Text, nullable=True)  # alternativa HTML opcional
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ContadorStatus(db.Model):
+    """Total de inscrições por programa e status, mantido incrementalmente."""
+    __tablename__ = 'contadores_status'
+    programa_id = db.Column(db.Integer, db.ForeignKey('programas.id'), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    total = db.Column(db.Integer, default=0, nullable=False)
+
+class CampoIndexado(db.Model):
+    """Cópia pesquisável (EAV) dos campos_extras marcados como indexados."""
+    __tablename__ = 'campos_indexados'
+    __table_args__ = (
+        db.Index('ix_campos_indexados_programa_valor', 'programa_id', 'campo', 'valor_texto'),
+        db.Index('ix_campos_indexados_valor', 'campo', 'valor_texto'),
+        db.Index('ix_campos_indexados_data', 'campo', 'valor_data'),
+        db.Index('ix_campos_indexados_inscricao', 'inscricao_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    inscricao_id = db.Column(db.Integer, db.ForeignKey('inscricoes.id'), nullable=False)
+    programa_id = db.Column(db.Integer, db.ForeignKey('programas.id'), nullable=False)
+    campo = db.Column(db.String(60), nullable=False)
+    valor_texto = db.Column(db.String(255), nullable=True)
+    valor_data = db.Column(db.Date, nullable=True)
+
+    inscricao = db.relationship(
+        'Inscricao',
+        backref=db.backref('campos_indexados', cascade='all, delete-orphan', lazy=True)
+    )
+
+class HistoricoStatus(db.Model):
+    """Auditoria das mudanças de status, uma linha por inscrição alterada."""
+    __tablename__ = 'historico_status'
+    __table_args__ = (
+        db.Index('ix_historico_status_inscricao', 'inscricao_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    inscricao_id = db.Column(db.Integer, db.ForeignKey('inscricoes.id'), nullable=False)
+    status_anterior = db.Column(db.String(20), nullable=False)
+    status_novo = db.Column(db.String(20), nullable=False)
+    admin_email = db.Column(db.String(120), nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+class EmailFila(db.Model):
+    __tablename__ = 'email_fila'
+    __table_args__ = (
+        db.Index('ix_email_fila_status_proxima', 'status', 'proxima_tentativa_em'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    inscricao_id = db.Column(db.Integer, db.ForeignKey('inscricoes.id'), nullable=True)
+    destinatario = db.Column(db.String(200), nullable=False)
+    assunto = db.Column(db.String(255), nullable=False)
+    corpo = db.Column(db.Text, nullable=False)
+    corpo_html = db.Column(db.Text, nullable=True)
+
+    # pendente -> enviado | falhou
+    status = db.Column(db.String(20), default='pendente', nullable=False)
+    tentativas = db.Column(db.Integer, default=0, nullable=False)
+    proxima_tentativa_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    ultimo_erro = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    enviado_em = db.Column(db.DateTime, nullable=True)
+
+    inscricao = db.relationship('Inscricao')
+
+class VersaoSchema(db.Model):
+    __tablename__ = 'schema_versao'
+    versao = db.Column(db.Integer, primary_key=True)
+    descricao = db.Column(db.String(255), nullable=False)
+    aplicada_em = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,262 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import METRICAS_FOLDER
+
+# PROFILING
+# Com PROFILING_ATIVO, cada requisição registra tempo total, quantidade e tempo
+# das consultas SQL e os trechos medidos com `medir()` (SMTP, gravação de
+# uploads). Cada requisição gera uma linha JSON no logger 'fiagot.profiling' e
+# alimenta as métricas de /admin/metrics. Desligado, nenhum hook é registrado
+# e `medir()` só testa uma flag.
+#
+# As métricas ficam em memória por processo e são gravadas periodicamente em
+# cache/metricas/<pid>.json; /admin/metrics soma os arquivos de todos os
+# workers (e do `flask processar-emails`). O arquivo é apagado quando o
+# processo termina; os de processos que morreram sem isso são descartados na
+# leitura.
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICAS_INTERVALO_GRAVACAO = 5
+
+logger_profiling = logging.getLogger('fiagot.profiling')
+_metricas = {'requisicoes': {}, 'duracao': {}, 'sql': {}, 'n_mais_um': {}, 'trechos': {}}
+_metricas_trava = threading.Lock()
+_metricas_gravadas_em = 0.0
+_ativo = False
+
+def _somar(serie: dict, chave, *valores):
+    atual = serie.get(chave)
+    serie[chave] = list(valores) if atual is None else [a + v for a, v in zip(atual, valores)]
+
+def registrar_trecho(trecho: str, duracao: float):
+    with _metricas_trava:
+        _somar(_metricas['trechos'], trecho, 1, duracao)
+    if has_request_context() and 'profiling' in g:
+        trechos = g.profiling['trechos']
+        trechos[trecho] = round(trechos.get(trecho, 0) + duracao * 1000, 2)
+    gravar_metricas()
+
+@contextmanager
+def medir(trecho: str):
+    """Mede o tempo do bloco como um trecho nomeado (só com profiling ativo)."""
+    if not _ativo:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_trecho(trecho, time.perf_counter() - inicio)
+
+def gravar_metricas(forcar: bool = False):
+    """Grava as métricas deste processo para o /admin/metrics (no máximo a cada 5s)."""
+    global _metricas_gravadas_em
+    agora = time.monotonic()
+    if not forcar and agora - _metricas_gravadas_em < METRICAS_INTERVALO_GRAVACAO:
+        return
+    _metricas_gravadas_em = agora
+    with _metricas_trava:
+        dados = {nome: [[list(k) if isinstance(k, tuple) else k, v] for k, v in serie.items()]
+                 for nome, serie in _metricas.items()}
+    os.makedirs(METRICAS_FOLDER, exist_ok=True)
+    destino = os.path.join(METRICAS_FOLDER, f'{os.getpid()}.json')
+    with open(f'{destino}.tmp', 'w') as f:
+        json.dump(dados, f)
+    os.replace(f'{destino}.tmp', destino)
+
+def remover_metricas_processo():
+    """Apaga o arquivo de métricas deste processo (na saída do worker)."""
+    caminho = os.path.join(METRICAS_FOLDER, f'{os.getpid()}.json')
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+def processo_ativo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def ler_metricas() -> dict:
+    """Soma as métricas gravadas pelos processos ativos (apaga as dos que já terminaram)."""
+    gravar_metricas(forcar=True)
+    total = {nome: {} for nome in _metricas}
+    for caminho in glob.glob(os.path.join(METRICAS_FOLDER, '*.json')):
+        pid = os.path.basename(caminho)[:-len('.json')]
+        if pid.isdigit() and not processo_ativo(int(pid)):
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(caminho) as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for nome, serie in dados.items():
+            for chave, valores in serie:
+                _somar(total.setdefault(nome, {}), tuple(chave) if isinstance(chave, list) else chave, *valores)
+    return total
+
+def rotulos_prometheus(**rotulos) -> str:
+    pares = []
+    for nome, valor in rotulos.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+        pares.append(f'{nome}="{valor}"')
+    return '{' + ','.join(pares) + '}'
+
+def metricas_prometheus(metricas: dict) -> str:
+    """Formata as métricas no formato de texto do Prometheus."""
+    linhas = [
+        '# HELP fiagot_requisicoes_total Requisições atendidas.',
+        '# TYPE fiagot_requisicoes_total counter',
+    ]
+    for (endpoint, metodo, status), (quantidade,) in sorted(metricas['requisicoes'].items()):
+        linhas.append(f'fiagot_requisicoes_total{rotulos_prometheus(endpoint=endpoint, metodo=metodo, status=status)} {quantidade}')
+
+    linhas += [
+        '# HELP fiagot_requisicao_segundos Duração das requisições.',
+        '# TYPE fiagot_requisicao_segundos histogram',
+    ]
+    for endpoint, valores in sorted(metricas['duracao'].items()):
+        *buckets, quantidade, soma = valores
+        acumulado = 0
+        for limite, contagem in zip(BUCKETS_DURACAO, buckets):
+            acumulado += contagem
+            linhas.append(f'fiagot_requisicao_segundos_bucket{rotulos_prometheus(endpoint=endpoint, le=limite)} {acumulado}')
+        linhas.append(f'fiagot_requisicao_segundos_bucket{rotulos_prometheus(endpoint=endpoint, le="+Inf")} {quantidade}')
+        linhas.append(f'fiagot_requisicao_segundos_sum{rotulos_prometheus(endpoint=endpoint)} {soma:.6f}')
+        linhas.append(f'fiagot_requisicao_segundos_count{rotulos_prometheus(endpoint=endpoint)} {quantidade}')
+
+    linhas += [
+        '# HELP fiagot_sql_consultas_total Consultas SQL executadas durante as requisições.',
+        '# TYPE fiagot_sql_consultas_total counter',
+    ]
+    linhas += [f'fiagot_sql_consultas_total{rotulos_prometheus(endpoint=e)} {v[0]}' for e, v in sorted(metricas['sql'].items())]
+    linhas += [
+        '# HELP fiagot_sql_segundos_total Tempo gasto em consultas SQL durante as requisições.',
+        '# TYPE fiagot_sql_segundos_total counter',
+    ]
+    linhas += [f'fiagot_sql_segundos_total{rotulos_prometheus(endpoint=e)} {v[1]:.6f}' for e, v in sorted(metricas['sql'].items())]
+    linhas += [
+        '# HELP fiagot_n_mais_um_total Requisições com a mesma consulta repetida (provável N+1).',
+        '# TYPE fiagot_n_mais_um_total counter',
+    ]
+    linhas += [f'fiagot_n_mais_um_total{rotulos_prometheus(endpoint=e)} {v[0]}' for e, v in sorted(metricas['n_mais_um'].items())]
+    linhas += [
+        '# HELP fiagot_trecho_segundos Duração dos trechos medidos (SMTP, uploads).',
+        '# TYPE fiagot_trecho_segundos summary',
+    ]
+    for trecho, (quantidade, soma) in sorted(metricas['trechos'].items()):
+        linhas.append(f'fiagot_trecho_segundos_sum{rotulos_prometheus(trecho=trecho)} {soma:.6f}')
+        linhas.append(f'fiagot_trecho_segundos_count{rotulos_prometheus(trecho=trecho)} {quantidade}')
+    return '\n'.join(linhas) + '\n'
+
+# O início fica no contexto de execução da própria consulta: se ela falhar, o
+# after_cursor_execute não é chamado e nada sobra para a consulta seguinte.
+def antes_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+    if contexto is not None:
+        contexto._profiling_inicio = time.perf_counter()
+
+def depois_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+    inicio = getattr(contexto, '_profiling_inicio', None)
+    if inicio is None or not has_request_context() or 'profiling' not in g:
+        return
+    duracao = time.perf_counter() - inicio
+    dados = g.profiling
+    dados['sql_consultas'] += 1
+    dados['sql_segundos'] += duracao
+    dados['sql_repeticoes'][sql] = dados['sql_repeticoes'].get(sql, 0) + 1
+
+def iniciar_profiling():
+    g.profiling = {
+        'inicio': time.perf_counter(),
+        'sql_consultas': 0,
+        'sql_segundos': 0.0,
+        'sql_repeticoes': {},
+        'trechos': {}
+    }
+
+def registrar_duracao(endpoint: str, duracao: float, dados: dict, repetidas: list):
+    """Soma a requisição ao histograma de duração e às métricas de SQL."""
+    with _metricas_trava:
+        buckets = [0] * len(BUCKETS_DURACAO)
+        for i, limite in enumerate(BUCKETS_DURACAO):
+            if duracao <= limite:
+                buckets[i] = 1
+                break
+        _somar(_metricas['duracao'], endpoint, *buckets, 1, duracao)
+        _somar(_metricas['sql'], endpoint, dados['sql_consultas'], dados['sql_segundos'])
+        if repetidas:
+            _somar(_metricas['n_mais_um'], endpoint, 1)
+
+def finalizar_profiling(resposta):
+    dados = g.pop('profiling', None)
+    if dados is None:
+        return resposta
+    duracao = time.perf_counter() - dados['inicio']
+    endpoint = request.endpoint or 'desconhecido'
+
+    # A mesma consulta muitas vezes na requisição costuma ser lazy load em laço
+    repetidas = [
+        {'sql': ' '.join(sql.split())[:200], 'vezes': vezes}
+        for sql, vezes in dados['sql_repeticoes'].items()
+        if vezes >= current_app.config['PROFILING_REPETICOES_N1']
+    ]
+
+    # Respostas em fluxo (eventos do painel, CSV) ainda não geraram o corpo
+    # aqui: a duração mediria só o início e distorceria o histograma
+    em_fluxo = resposta.is_streamed
+
+    with _metricas_trava:
+        _somar(_metricas['requisicoes'], (endpoint, request.method, str(resposta.status_code)), 1)
+    if not em_fluxo:
+        registrar_duracao(endpoint, duracao, dados, repetidas)
+    gravar_metricas()
+
+    registro = {
+        'evento': 'requisicao',
+        'metodo': request.method,
+        'caminho': request.path,
+        'endpoint': endpoint,
+        'status': resposta.status_code,
+        'duracao_ms': round(duracao * 1000, 2),
+        'sql_consultas': dados['sql_consultas'],
+        'sql_ms': round(dados['sql_segundos'] * 1000, 2),
+        'trechos_ms': dados['trechos']
+    }
+    if em_fluxo:
+        registro['em_fluxo'] = True
+    if repetidas:
+        registro['n_mais_um'] = repetidas
+    logger_profiling.log(logging.WARNING if repetidas else logging.INFO, json.dumps(registro, ensure_ascii=False))
+    return resposta
+
+def instalar_profiling(app):
+    """Registra os hooks do profiling no app e nos engines (chamado pelo create_app)."""
+    global _ativo
+    if not _ativo:
+        atexit.register(remover_metricas_processo)
+    _ativo = True
+    if not logger_profiling.handlers:
+        logger_profiling.addHandler(logging.StreamHandler())
+        logger_profiling.setLevel(logging.INFO)
+        logger_profiling.propagate = False
+    if not event.contains(Engine, 'before_cursor_execute', antes_consulta):
+        event.listen(Engine, 'before_cursor_execute', antes_consulta)
+        event.listen(Engine, 'after_cursor_execute', depois_consulta)
+    app.before_request(iniciar_profiling)
+    app.after_request(finalizar_profiling)
@@ -0,0 +1,136 @@
+import re
+import uuid
+from datetime import date
+
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, url_for
+from sqlalchemy.exc import IntegrityError
+
+from .banco import ajustar_contador, executar_com_retentativa
+from .cache import cache_pagina
+from .campos import chave_unica, indexar_campos, inscricao_existente, token_em_uso
+from .emails import enfileirar_email_confirmacao
+from .modelos import db, Inscricao
+from .registro import programa_ativo, programas_ativos
+from .uploads import agendar_derivados, remover_uploads_sem_uso, salvar_upload
+
+bp = Blueprint('publico', __name__)
+
+# ROTAS PÚBLICAS
+@bp.route('/')
+@cache_pagina
+def index():
+    return render_template('index.html', programas=programas_ativos(), hoje=date.today())
+
+@bp.route('/programa/<slug>')
+@cache_pagina
+def programa_detalhe(slug):
+    programa = programa_ativo(slug)
+    if programa is None:
+        abort(404)
+    hoje = date.today()
+    return render_template(
+        'programa.html',
+        programa=programa,
+        avisos=programa.avisos,
+        aberto=programa.situacao(hoje) == 'aberto',
+        hoje=hoje
+    )
+
+@bp.route('/inscricao/<slug>', methods=['GET', 'POST'])
+def inscricao(slug):
+    programa = programa_ativo(slug)
+    if programa is None:
+        abort(404)
+    situacao = programa.situacao(date.today())
+    
+    if situacao == 'nao_aberto':
+        flash('Inscrições ainda não foram abertas para este programa.', 'warning')
+        return redirect(url_for('publico.programa_detalhe', slug=slug))
+    if situacao == 'encerrado':
+        flash('Inscrições encerradas para este programa.', 'warning')
+        return redirect(url_for('publico.programa_detalhe', slug=slug))
+
+    if request.method == 'POST':
+        # Token do formulário: identifica reenvios (duplo clique, rede lenta)
+        token_envio = request.form.get('token_envio', '')
+        if not re.fullmatch(r'[0-9a-f]{32}', token_envio):
+            token_envio = None
+
+        # Campos, tipos e arquivos validados pelo esquema do programa (fiagot/campos.py),
+        # antes de qualquer acesso ao banco ou gravação em disco
+        validacao = programa.esquema.validar(request.form, request.files)
+        if validacao['desconhecidos']:
+            current_app.logger.warning(
+                'Inscrição em %s com campos desconhecidos: %s', slug, ', '.join(validacao['desconhecidos'])
+            )
+        if validacao['erros']:
+            for e in validacao['erros']:
+                flash(e, 'danger')
+            return render_template('inscricao.html', programa=programa, token_envio=token_envio or uuid.uuid4().hex)
+        dados = validacao['dados']
+        campos_extras = validacao['campos_extras']
+
+        # Duplicada: responde como a original, sem gravar arquivos nem enviar email
+        chave = chave_unica(dict(campos_extras, **dados))
+        existente = inscricao_existente(programa.id, token_envio, chave, dados['email'])
+        if existente:
+            return resposta_inscricao_duplicada(existente, token_envio, slug)
+        if token_envio and token_em_uso(token_envio):
+            # Token de outro envio (outra pessoa ou programa): grava com um token novo
+            token_envio = uuid.uuid4().hex
+
+        # Upload de arquivos, com a extensão conferida pelo conteúdo
+        arquivos = {
+            nome: salvar_upload(arquivo, extensao) for nome, (arquivo, extensao) in validacao['arquivos'].items()
+        }
+        foto_filename = arquivos.get('foto')
+        curriculo_filename = arquivos.get('curriculo')
+
+        # Criar inscrição (repetida por inteiro se o banco estiver travado)
+        def gravar_inscricao():
+            inscricao_obj = Inscricao(
+                nome=dados['nome'],
+                email=dados['email'],
+                telefone=dados['telefone'],
+                estado=dados['estado'],
+                campos_extras=campos_extras,
+                foto_filename=foto_filename,
+                curriculo_filename=curriculo_filename,
+                programa_id=programa.id,
+                status='pendente',
+                token_envio=token_envio,
+                chave_unica=chave
+            )
+            db.session.add(inscricao_obj)
+            indexar_campos(inscricao_obj, programa.slug)
+            ajustar_contador(programa.id, 'pendente', 1)
+            enfileirar_email_confirmacao(inscricao_obj, programa)
+            return inscricao_obj
+
+        try:
+            executar_com_retentativa(gravar_inscricao)
+        except IntegrityError:
+            # Outro envio igual foi gravado entre a verificação e o commit
+            db.session.rollback()
+            # Os arquivos recém-gravados ficariam sem referência
+            remover_uploads_sem_uso(set(arquivos.values()))
+            existente = inscricao_existente(programa.id, token_envio, chave, dados['email'])
+            if existente is None:
+                raise
+            return resposta_inscricao_duplicada(existente, token_envio, slug)
+
+        if foto_filename:
+            agendar_derivados(foto_filename)
+        
+        flash('Inscrição realizada com sucesso! Você receberá um email de confirmação.', 'success')
+        return redirect(url_for('publico.programa_detalhe', slug=slug))
+
+    return render_template('inscricao.html', programa=programa, token_envio=uuid.uuid4().hex)
+
+def resposta_inscricao_duplicada(existente: Inscricao, token_envio: str, slug: str):
+    if token_envio and existente.token_envio == token_envio:
+        # Reenvio do mesmo formulário: mesmo resultado do primeiro envio
+        flash('Inscrição realizada com sucesso! Você receberá um email de confirmação.', 'success')
+    else:
+        flash('Já recebemos uma inscrição sua neste programa. Não é necessário enviar novamente.', 'info')
+    return redirect(url_for('publico.programa_detalhe', slug=slug))
@@ -0,0 +1,79 @@
+import threading
+from datetime import date
+
+from .cache import versao_conteudo
+from .campos import esquema_programa
+from .modelos import Aviso, Programa
+
+# REGISTRO DE PROGRAMAS
+# Programas ativos, janelas de inscrição, avisos ativos e o esquema de
+# validação de cada programa, carregados uma vez por processo. As rotas
+# públicas leem daqui sem consultar o banco. A cada requisição só a versão do
+# conteúdo é conferida (um stat no arquivo marcador); quando o admin salva
+# programas ou avisos, `invalidar_conteudo_publico` muda a versão e cada
+# worker recarrega o registro na requisição seguinte.
+
+class AvisoRegistrado:
+    def __init__(self, aviso: Aviso):
+        self.id = aviso.id
+        self.titulo = aviso.titulo
+        self.descricao = aviso.descricao
+
+class ProgramaRegistrado:
+    """Cópia somente leitura de um Programa ativo, compartilhada entre requisições."""
+
+    def __init__(self, programa: Programa, avisos: list):
+        self.id = programa.id
+        self.nome = programa.nome
+        self.slug = programa.slug
+        self.descricao_curta = programa.descricao_curta
+        self.descricao = programa.descricao
+        self.data_abertura = programa.data_abertura
+        self.data_fechamento = programa.data_fechamento
+        self.ativo = programa.ativo
+        self.avisos = avisos
+        self.esquema = esquema_programa(programa.slug)
+
+    def situacao(self, hoje: date = None) -> str:
+        """'aberto', 'nao_aberto' ou 'encerrado', conforme a janela de inscrição."""
+        hoje = hoje or date.today()
+        if self.data_abertura and hoje < self.data_abertura:
+            return 'nao_aberto'
+        if self.data_fechamento and hoje > self.data_fechamento:
+            return 'encerrado'
+        return 'aberto'
+
+_registro = {'versao': None, 'programas': {}}
+_registro_trava = threading.Lock()
+
+def carregar_registro(versao: str) -> dict:
+    """Lê programas e avisos ativos do banco (duas consultas)."""
+    avisos = {}
+    for aviso in Aviso.query.filter_by(ativo=True).order_by(Aviso.id):
+        avisos.setdefault(aviso.programa_id, []).append(AvisoRegistrado(aviso))
+    programas = Programa.query.filter_by(ativo=True).order_by(Programa.id)
+    return {
+        'versao': versao,
+        'programas': {p.slug: ProgramaRegistrado(p, avisos.get(p.id, [])) for p in programas}
+    }
+
+def registro_programas() -> dict:
+    """Programas ativos por slug, recarregados se a versão do conteúdo mudou."""
+    global _registro
+    # A versão é lida antes das consultas: uma alteração feita durante a
+    # carga deixa o registro com a versão antiga e ele é lido de novo.
+    versao, _ = versao_conteudo()
+    registro = _registro
+    if registro['versao'] != versao:
+        with _registro_trava:
+            if _registro['versao'] != versao:
+                _registro = carregar_registro(versao)
+            registro = _registro
+    return registro['programas']
+
+def programas_ativos() -> list:
+    return list(registro_programas().values())
+
+def programa_ativo(slug: str):
+    """Programa ativo com o slug informado; None se não existir."""
+    return registro_programas().get(slug)
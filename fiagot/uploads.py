@@ -0,0 +1,126 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import select
+
+from .modelos import db, Inscricao
+from .profiling import medir
+
+UPLOAD_BLOCO = 64 * 1024
+
+# Primeiros bytes de cada formato aceito; a extensão gravada vem do conteúdo,
+# não do nome enviado pelo navegador.
+ASSINATURAS = {
+    'img': [(b'\xff\xd8\xff', 'jpg'), (b'\x89PNG\r\n\x1a\n', 'png')],
+    'pdf': [(b'%PDF-', 'pdf')],
+}
+FORMATOS_ARQUIVO = {'img': 'PNG ou JPG', 'pdf': 'PDF'}
+
+DERIVADOS_TAMANHOS = {'mini': 160, 'media': 1024}
+DERIVADOS_MAX_AGE = 365 * 24 * 3600
+
+def extensao_pelo_conteudo(arquivo, tipos: list):
+    """Extensão do upload conforme os primeiros bytes (None se não for de um dos tipos)."""
+    inicio = arquivo.stream.read(8)
+    arquivo.stream.seek(0)
+    for tipo in tipos:
+        for assinatura, extensao in ASSINATURAS[tipo]:
+            if inicio.startswith(assinatura):
+                return extensao
+    return None
+
+def salvar_upload(arquivo, extensao: str) -> str:
+    """Grava o upload em blocos, nomeado pelo SHA-256 do conteúdo.
+
+    Retorna o caminho relativo à pasta de uploads, distribuído em
+    subpastas (ex.: 'ab/cd/abcd...ef.jpg'). Um arquivo idêntico a outro já
+    enviado reaproveita o existente.
+    """
+    pasta = current_app.config['UPLOAD_FOLDER']
+    os.makedirs(pasta, exist_ok=True)
+
+    sha256 = hashlib.sha256()
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix='.part')
+    try:
+        with medir('upload_gravacao'), os.fdopen(fd, 'wb') as destino:
+            while True:
+                bloco = arquivo.stream.read(UPLOAD_BLOCO)
+                if not bloco:
+                    break
+                sha256.update(bloco)
+                destino.write(bloco)
+        digest = sha256.hexdigest()
+        relativo = f'{digest[:2]}/{digest[2:4]}/{digest}.{extensao}'
+        final = os.path.join(pasta, relativo)
+        if os.path.exists(final):
+            os.remove(temporario)
+        else:
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(temporario, final)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return relativo
+
+def remover_uploads_sem_uso(arquivos: set):
+    """Apaga da pasta de uploads (e os derivados) os arquivos que nenhuma inscrição ativa usa."""
+    if not arquivos:
+        return
+    candidatos = list(arquivos)
+    em_uso = set(db.session.scalars(select(Inscricao.foto_filename).where(Inscricao.foto_filename.in_(candidatos))))
+    em_uso.update(db.session.scalars(
+        select(Inscricao.curriculo_filename).where(Inscricao.curriculo_filename.in_(candidatos))
+    ))
+    for relativo in arquivos - em_uso:
+        caminhos = [os.path.join(current_app.config['UPLOAD_FOLDER'], relativo)]
+        caminhos += [caminho_derivado(relativo, tamanho) for tamanho in DERIVADOS_TAMANHOS]
+        for caminho in caminhos:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+def caminho_derivado(relativo: str, tamanho: str) -> str:
+    base = relativo.rsplit('.', 1)[0]
+    return os.path.join(current_app.config['DERIVADOS_FOLDER'], f'{base}_{tamanho}.webp')
+
+def gerar_derivados(relativo: str):
+    """Gera as versões webp (miniatura e média) de uma foto enviada."""
+    from PIL import Image, ImageOps
+
+    original = os.path.join(current_app.config['UPLOAD_FOLDER'], relativo)
+    if not os.path.exists(original):
+        return
+    with Image.open(original) as imagem:
+        imagem = ImageOps.exif_transpose(imagem).convert('RGB')
+        for tamanho, lado in DERIVADOS_TAMANHOS.items():
+            destino = caminho_derivado(relativo, tamanho)
+            if os.path.exists(destino):
+                continue
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            copia = imagem.copy()
+            copia.thumbnail((lado, lado))
+            temporario = f'{destino}.{uuid.uuid4().hex}.tmp'
+            copia.save(temporario, 'WEBP', quality=80)
+            os.replace(temporario, destino)
+
+_executor_derivados = None
+
+def agendar_derivados(relativo: str):
+    """Enfileira a geração dos derivados sem segurar a requisição."""
+    global _executor_derivados
+    if _executor_derivados is None:
+        _executor_derivados = ThreadPoolExecutor(max_workers=2, thread_name_prefix='derivados')
+    app = current_app._get_current_object()
+
+    def gerar():
+        with app.app_context():
+            gerar_derivados(relativo)
+
+    futuro = _executor_derivados.submit(gerar)
+    futuro.add_done_callback(
+        lambda f: f.exception() and app.logger.error('Erro ao gerar derivados de %s: %s', relativo, f.exception())
+    )